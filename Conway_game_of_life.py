@@ -3,12 +3,72 @@ import numpy as np
 import time
 import threading
 import sys
+import os
+import struct
+import argparse
+import re
+import queue
+import zlib
+import hashlib
+import collections
+
+import barriers
 
 # Constants
 ALIVE = 1
 DEAD = 0
 
-# Shared flag to indicate whether the game should stop
+# Cells are stored one byte each; MPI_CELL must match CELL_DTYPE
+CELL_DTYPE = np.uint8
+MPI_CELL = MPI.UNSIGNED_CHAR
+
+# Packed mode stores 64 cells per word, column j in bit j % 64 of word j // 64
+WORD_BITS = 64
+WORD_DTYPE = np.uint64
+MPI_WORD = MPI.UINT64_T
+
+# Checkpoint files are a fixed-size header followed by the raw global grid,
+# row-major, so they can be opened with np.memmap(offset=CHECKPOINT_HEADER_SIZE)
+CHECKPOINT_MAGIC = b"LIFECKPT"
+CHECKPOINT_VERSION = 1
+CHECKPOINT_HEADER = struct.Struct("<8sIIQQQQ")  # magic, version, packed, rows, cols, width, generation
+CHECKPOINT_HEADER_SIZE = 64
+
+# Pattern files: the RLE header ("x = 3, y = 3, rule = B3/S23"), RLE
+# tokens (optional run count, then a tag) and live cells of plaintext rows
+RLE_HEADER = re.compile(r"\s*x\s*=\s*(\d+)\s*,\s*y\s*=\s*(\d+)")
+RLE_TOKEN = re.compile(r"(\d*)(\D)")
+PLAINTEXT_LIVE = re.compile(r"[O*]+")
+
+# Random cells are drawn this many at a time
+RANDOM_BLOCK = 1 << 22
+
+# Text frames: character of a dead and a live cell, indexed by cell value;
+# RLE frames wrap their lines at this width
+CELL_CHARS = np.frombuffer(b".O", dtype=np.uint8)
+RLE_LINE_WIDTH = 70
+
+# Neighbor directions as (row, column) offsets; a halo message is tagged
+# with the index of the direction it travels in
+DIRECTIONS = [(-1, -1), (-1, 0), (-1, 1),
+              (0, -1),           (0, 1),
+              (1, -1),  (1, 0),  (1, 1)]
+
+# Control commands (bit flags, combined with MPI_BOR) and the terminal
+# input that requests them; Enter alone stops the game
+CONTROL_STOP = 1
+CONTROL_PAUSE = 2
+CONTROL_CHECKPOINT = 4
+CONTROL_OUTPUT = 8
+CONTROL_KEYS = {"": CONTROL_STOP, "q": CONTROL_STOP, "p": CONTROL_PAUSE, "c": CONTROL_CHECKPOINT,
+                "o": CONTROL_OUTPUT}
+CONTROL_PAUSE_POLL = 0.1  # seconds between polls while paused
+
+# Checkpoints requested from the terminal go here without --checkpoint
+DEFAULT_CHECKPOINT = "life_{generation}.ckpt"
+
+# Shared flag to indicate whether the game should stop (single-process
+# HashLife runs; run_game uses a ControlChannel)
 stop_game = False
 
 
@@ -19,44 +79,149 @@ def stop_game_listener():
     stop_game = True
 
 
-def tree_barrier(rank, numprocs, comm):
+def is_rle(path):
+    return path.lower().endswith(".rle")
+
+
+def pattern_size(path):
     """
-    Implements a tree-based barrier synchronization.
+    Return (height, width) of an RLE or plaintext pattern file. RLE files
+    give it in their header; plaintext files are scanned.
     """
-    # Phase 1: Gather (Bottom-up)
-    mask = 1
-    while mask < numprocs:
-        target = rank ^ mask  # XOR to find communication partner
-        if target < numprocs:
-            if rank > target:
-                comm.send(True, dest=target, tag=mask)
-            else:
-                comm.recv(source=target, tag=mask)
-        mask <<= 1
-
-    # Phase 2: Release (Top-down)
-    mask = numprocs >> 1
-    while mask > 0:
-        target = rank ^ mask
-        if target < numprocs:
-            if rank < target:
-                comm.send(True, dest=target, tag=mask)
-            else:
-                comm.recv(source=target, tag=mask)
-        mask >>= 1
+    height = width = 0
+    with open(path) as f:
+        if not is_rle(path):
+            for line in f:
+                if not line.startswith("!"):
+                    height, width = height + 1, max(width, len(line.rstrip()))
+            return height, width
+        for line in f:
+            if not line.startswith("#"):
+                header = RLE_HEADER.match(line)
+                if header:
+                    return int(header.group(2)), int(header.group(1))
+                break
 
+    # No header: measure the runs
+    for row, col, length in pattern_runs(path):
+        height, width = max(height, row + 1), max(width, col + length)
+    return height, width
 
-def initialize_grid(rows, cols):
+
+def pattern_runs(path, first_row=0):
+    """
+    Stream the live cells of an RLE (.rle) or plaintext (.cells, .txt)
+    pattern file as (row, col, length) runs, in row order, from first_row
+    on. Rows before first_row are skipped without being built, so a rank can
+    read just the rows it owns and stop early.
     """
-    Initialize the grid with a few live cells.
+    with open(path) as f:
+        if not is_rle(path):
+            row = 0
+            for line in f:
+                if line.startswith("!"):
+                    continue
+                if row >= first_row:
+                    for run in PLAINTEXT_LIVE.finditer(line):
+                        yield row, run.start(), run.end() - run.start()
+                row += 1
+            return
+
+        row = col = 0
+        pending = ""
+        header = True
+        for line in f:
+            if line.startswith("#"):
+                continue
+            if header:
+                header = False
+                if RLE_HEADER.match(line):
+                    continue
+            line = pending + "".join(line.split())
+
+            # A run count may be split from its tag by a line break
+            body = line.rstrip("0123456789")
+            pending = line[len(body):]
+            for count, tag in RLE_TOKEN.findall(body):
+                count = int(count) if count else 1
+                if tag == "!":
+                    return
+                if tag == "$":
+                    row, col = row + count, 0
+                elif tag in "b.":
+                    col += count
+                else:
+                    if row >= first_row:
+                        yield row, col, count
+                    col += count
+
+
+def initialize_tile(rows, cols, row_start, row_stop, col_start, col_stop, pattern="plus",
+                    density=0.25, seed=None, size=None):
     """
-    grid = np.zeros((rows, cols), dtype=int)
-    live_positions = [(rows // 2, cols // 2), (rows // 2 - 1, cols // 2),
-                      (rows // 2 + 1, cols // 2), (rows // 2, cols // 2 - 1),
-                      (rows // 2, cols // 2 + 1)]
-    for x, y in live_positions:
-        grid[x, y] = ALIVE
-    return grid
+    Build rows row_start..row_stop-1 and columns col_start..col_stop-1 of
+    the initial rows x cols board, without building the rest of it.
+
+    pattern is "plus" (a few live cells), "random" (each cell alive with
+    the given density) or the path of an RLE or plaintext file, placed in
+    the middle of the board and clipped to it. A random board comes from one
+    PCG64 stream read row by row; every tile jumps to its own cells, so the
+    board is the same however it is split, as long as the seed is. size is
+    the (height, width) of a pattern file if already known (see
+    pattern_size).
+    """
+    tile = np.zeros((row_stop - row_start, col_stop - col_start), dtype=CELL_DTYPE)
+    if pattern == "random":
+        bit_generator = np.random.PCG64(seed)
+        rng = np.random.Generator(bit_generator)
+        position = 0
+        if col_start == 0 and col_stop == cols:
+            # Whole rows are contiguous in the stream; draw a block at a time
+            bit_generator.advance(row_start * cols)
+            step = max(1, RANDOM_BLOCK // cols)
+            for start in range(0, tile.shape[0], step):
+                block = tile[start:start + step]
+                block[...] = rng.random(block.shape) < density
+            return tile
+        for row in range(row_start, row_stop):
+            target = row * cols + col_start
+            bit_generator.advance(target - position)
+            tile[row - row_start] = rng.random(tile.shape[1]) < density
+            position = target + tile.shape[1]
+        return tile
+
+    if pattern == "plus":
+        live_positions = [(rows // 2, cols // 2), (rows // 2 - 1, cols // 2),
+                          (rows // 2 + 1, cols // 2), (rows // 2, cols // 2 - 1),
+                          (rows // 2, cols // 2 + 1)]
+        for x, y in live_positions:
+            if row_start <= x < row_stop and col_start <= y < col_stop:
+                tile[x - row_start, y - col_start] = ALIVE
+        return tile
+
+    if not os.path.isfile(pattern):
+        raise ValueError(f"Unknown pattern: {pattern}")
+    height, width = size or pattern_size(pattern)
+    top, left = (rows - height) // 2, (cols - width) // 2
+    runs = pattern_runs(pattern, first_row=max(0, row_start - top))
+    try:
+        for row, col, length in runs:
+            row += top
+            if row >= row_stop:
+                break
+            start, stop = max(col + left, col_start), min(col + left + length, col_stop)
+            if row >= row_start and start < stop:
+                tile[row - row_start, start - col_start:stop - col_start] = ALIVE
+    finally:
+        runs.close()
+    return tile
+
+
+def initialize_grid(rows, cols, pattern="plus", density=0.25, seed=None):
+    """
+    Initialize the whole grid on one process (see initialize_tile).
+    """
+    return initialize_tile(rows, cols, 0, rows, 0, cols, pattern, density, seed)
 
 
 def count_neighbors(grid, x, y, rows, cols):
@@ -75,9 +240,13 @@ def count_neighbors(grid, x, y, rows, cols):
     return count
 
 
-def update_grid(local_grid, rows, cols):
+def update_grid_reference(local_grid, rows, cols):
     """
-    Compute the next state of the grid.
+    Compute the next state of the grid one cell at a time.
+
+    Works on a grid with halo rows only and wraps the columns itself; pad
+    the columns with their wrapped neighbors to compare against update_grid.
+    Kept as the reference for the fast kernels; far too slow for real runs.
     """
     new_grid = local_grid.copy()
     for i in range(1, rows - 1):  # Exclude halo rows
@@ -90,96 +259,1748 @@ def update_grid(local_grid, rows, cols):
     return new_grid
 
 
+def update_block(local_grid, new_grid, row_start, row_stop, col_start, col_stop):
+    """
+    Write the next state of local_grid[row_start:row_stop, col_start:col_stop]
+    into the same block of new_grid.
+
+    Whole-array version of update_grid_reference: the neighbor sums are built
+    from shifted slices of the halo-padded grid, and the birth/survival rule
+    is applied as one boolean expression. Only the block and the ring of
+    cells around it are read, so a block can be updated while the halos are
+    still in flight. Leading axes are carried along, so a stack of padded
+    grids (see life_ensemble.py) is updated in one call.
+    """
+    if row_start >= row_stop or col_start >= col_stop:
+        return
+    grid = local_grid[..., row_start - 1:row_stop + 1, col_start - 1:col_stop + 1]
+
+    # Horizontal three-cell sums for every row of the block and its ring
+    row_sums = grid[..., :-2] + grid[..., 1:-1]
+    row_sums += grid[..., 2:]
+
+    # Stack the sums of the rows above, at and below each row, then take
+    # the cell itself back out
+    center = grid[..., 1:-1, 1:-1]
+    neighbors = row_sums[..., :-2, :] + row_sums[..., 1:-1, :]
+    neighbors += row_sums[..., 2:, :]
+    neighbors -= center
+
+    new_grid[..., row_start:row_stop, col_start:col_stop] = (
+        (neighbors == 3) | ((center == ALIVE) & (neighbors == 2))
+    )
+
+
+def update_grid(local_grid, rows, cols):
+    """
+    Compute the next state of a grid padded with one halo cell on every
+    side; rows and cols are the padded dimensions.
+    """
+    new_grid = local_grid.copy()
+    update_block(local_grid, new_grid, 1, rows - 1, 1, cols - 1)
+    return new_grid
+
+
+def step_board(board):
+    """
+    Advance a whole, unpadded board by one generation on a single process:
+    dead cells beyond the top and bottom rows, columns wrapping around.
+    This is the depth-1 stencil path the distributed modes must match.
+    """
+    rows, cols = board.shape
+    padded = np.zeros((rows + 2, cols + 2), dtype=CELL_DTYPE)
+    padded[1:-1, 1:-1] = board
+    padded[1:-1, 0] = board[:, -1]
+    padded[1:-1, -1] = board[:, 0]
+    return update_grid(padded, rows + 2, cols + 2)[1:-1, 1:-1]
+
+
+def packed_width(cols):
+    """
+    Number of 64-bit words needed to hold one packed row of cols cells.
+    """
+    return (cols + WORD_BITS - 1) // WORD_BITS
+
+
+def pack_grid(grid):
+    """
+    Pack a 0/1 cell grid into 64 cells per uint64 word, row by row.
+    Padding bits past the last column are zero.
+    """
+    rows, cols = grid.shape
+    width = packed_width(cols)
+    padded = np.zeros((rows, width * WORD_BITS), dtype=np.uint8)
+    padded[:, :cols] = grid
+    packed_bytes = np.packbits(padded, axis=1, bitorder="little")
+    return np.ascontiguousarray(packed_bytes).view("<u8").astype(WORD_DTYPE, copy=False)
+
+
+def unpack_grid(packed, cols):
+    """
+    Inverse of pack_grid: expand packed words back into a 0/1 cell grid.
+    """
+    packed_bytes = np.ascontiguousarray(packed, dtype="<u8").view(np.uint8)
+    cells = np.unpackbits(packed_bytes, axis=1, bitorder="little")
+    return cells[:, :cols].astype(CELL_DTYPE, copy=False)
+
+
+def update_rows_packed(local_grid, new_grid, start, stop, cols):
+    """
+    Write the next state of rows start..stop-1 of a packed grid (see
+    pack_grid) into new_grid.
+
+    Packed rows have halo rows above and below but no column halo: the
+    columns wrap around inside the kernel, so a packed grid is always split
+    into whole rows. Every word operation advances 64 cells at once.
+    """
+    if start >= stop:
+        return
+    grid = local_grid[start - 1:stop + 1]
+    last_bit = WORD_DTYPE((cols - 1) % WORD_BITS)
+    one = WORD_DTYPE(1)
+    top_bit = WORD_DTYPE(WORD_BITS - 1)
+
+    # West and east neighbors of every cell, carrying bits across words and
+    # wrapping between column 0 and column cols - 1
+    west = grid << one
+    west[:, 1:] |= grid[:, :-1] >> top_bit
+    west[:, 0] |= (grid[:, -1] >> last_bit) & one
+    east = grid >> one
+    east[:, :-1] |= grid[:, 1:] << top_bit
+    east[:, -1] |= (grid[:, 0] & one) << last_bit
+
+    # Two-bit horizontal sum (west + cell + east) for every row
+    sum0 = west ^ grid ^ east
+    sum1 = (west & grid) | (east & (west ^ grid))
+
+    # Add the sums of the rows above, at and below: total is the 3x3 block
+    # count including the cell itself, kept as four bit-planes
+    a0, a1 = sum0[:-2], sum1[:-2]
+    b0, b1 = sum0[1:-1], sum1[1:-1]
+    c0, c1 = sum0[2:], sum1[2:]
+    s0 = a0 ^ b0
+    carry = a0 & b0
+    s1 = a1 ^ b1 ^ carry
+    s2 = (a1 & b1) | (carry & (a1 ^ b1))
+    t0 = s0 ^ c0
+    carry = s0 & c0
+    t1 = s1 ^ c1 ^ carry
+    carry = (s1 & c1) | (carry & (s1 ^ c1))
+    t2 = s2 ^ carry
+    t3 = s2 & carry
+
+    # Alive next if the block holds 3, or 4 with the cell itself alive
+    three = ~t3 & ~t2 & t1 & t0
+    four = ~t3 & t2 & ~t1 & ~t0
+    new_rows = three | (four & grid[1:-1])
+
+    # Keep the padding bits of the last word clear
+    if cols % WORD_BITS:
+        new_rows[:, -1] &= WORD_DTYPE((1 << (cols % WORD_BITS)) - 1)
+
+    new_grid[start:stop] = new_rows
+
+
+def update_grid_packed(local_grid, rows, cols):
+    """
+    Compute the next state of a packed grid with one halo row above and
+    below; rows is the padded row count and cols the number of cells.
+    """
+    new_grid = local_grid.copy()
+    update_rows_packed(local_grid, new_grid, 1, rows - 1, cols)
+    return new_grid
+
+
+def format_grid(grid):
+    """
+    Render the grid as text, one line per row, with O for live cells.
+    """
+    rows, cols = grid.shape
+    lines = np.full((rows, cols + 1), ord("\n"), dtype=np.uint8)
+    lines[:, :cols] = CELL_CHARS[grid]
+    return lines.tobytes().decode("ascii")
+
+
 def print_grid(grid):
     """
     Print the grid.
     """
-    for row in grid:
-        print("".join("O" if cell == ALIVE else "." for cell in row))
-    print()
+    print(format_grid(grid))
 
 
-def main():
-    global stop_game
+def encode_png(grid):
+    """
+    Encode the grid as a 1-bit grayscale PNG: live cells black, dead white.
+    """
+    rows, cols = grid.shape
+    lines = np.zeros((rows, 1 + (cols + 7) // 8), dtype=np.uint8)  # filter byte 0 per row
+    lines[:, 1:] = np.packbits(grid != ALIVE, axis=1)
 
-    comm = MPI.COMM_WORLD
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", cols, rows, 1, 0, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(lines.tobytes(), 6))
+            + chunk(b"IEND", b""))
+
+
+def encode_rle(grid, comment=None):
+    """
+    Encode the grid as an RLE pattern, which pattern_runs can read back.
+    """
+    rows, cols = grid.shape
+    tokens = []
+    row_written = 0
+
+    def run(count, tag):
+        tokens.append(f"{count}{tag}" if count > 1 else tag)
+
+    for r, row in enumerate(grid):
+        edges = np.flatnonzero(np.diff(np.concatenate(([DEAD], row, [DEAD])).astype(np.int8)))
+        if not edges.size:
+            continue
+        if r > row_written:
+            run(r - row_written, "$")
+            row_written = r
+        col = 0
+        for start, stop in zip(edges[0::2], edges[1::2]):
+            if start > col:
+                run(start - col, "b")
+            run(stop - start, "o")
+            col = stop
+    tokens.append("!")
+
+    lines = [f"#C {comment}"] if comment else []
+    lines.append(f"x = {cols}, y = {rows}, rule = B3/S23")
+    line = ""
+    for token in tokens:
+        if len(line) + len(token) > RLE_LINE_WIDTH:
+            lines.append(line)
+            line = ""
+        line += token
+    lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+class FrameWriter:
+    """
+    Writes frames from a background thread, so the game never waits on the
+    terminal or the disk.
+
+    submit() hands a copy of the board to the thread through a queue of at
+    most max_queue frames. When the queue is full the frame is dropped, so a
+    slow writer only sees every other (or every n-th) frame instead of
+    holding the game up. The format follows the path: "-" prints to the
+    terminal, *.npz and *.png write one compressed file per frame
+    ("{generation}" in the path is replaced by the generation number), and
+    *.rle appends every frame to one run-length log.
+
+    *.delta logs only the cells that changed, for the delta output mode
+    (deltas=True): a "#delta ROWS COLS" line, then one line per frame with
+    the generation and the indices (row * COLS + col) of the cells that
+    flipped since the previous line. The first line lists the live cells
+    of the starting board. Since every line builds on the one before, delta
+    frames wait for room instead of being dropped.
+    """
+
+    def __init__(self, path="-", max_queue=4, deltas=False):
+        extension = os.path.splitext(path)[1].lower()
+        if path == "-":
+            self.format = "text"
+        elif extension in (".npz", ".png", ".rle", ".delta"):
+            self.format = extension[1:]
+        else:
+            raise ValueError(f"Unknown frame format: {path} (use -, *.npz, *.png, *.rle or *.delta)")
+        if self.format == "delta" and not deltas:
+            raise ValueError("Delta logs (*.delta) need the delta output mode")
+        # Queue(0) would be unbounded rather than drop every frame
+        if max_queue < 1:
+            raise ValueError(f"Frame queue must hold at least 1 frame, not {max_queue}")
+        if self.format in ("npz", "png") and "{generation}" not in path:
+            path = f"{path[:-len(extension)]}_{{generation}}{extension}"
+        # Fail now rather than in the writer thread halfway through the run
+        directory = os.path.dirname(path)
+        if directory and not os.path.isdir(directory):
+            raise FileNotFoundError(f"Frame directory {directory} does not exist")
+        self.path = path
+        self.log = open(path, "w") if self.format in ("rle", "delta") else None
+        self.shape = None
+        self.written = 0
+        self.dropped = 0
+        self.error = None
+        self.frames = queue.Queue(max_queue)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def submit(self, generation, board, wait=False, changes=None):
+        """
+        Queue a frame; returns False if it was dropped because the queue is
+        full or the writer has failed. With wait=True, block for room instead
+        (for final frames). changes holds the indices of the cells that
+        changed since the last frame, which a delta log writes instead of
+        the board.
+        """
+        if self.format == "delta":
+            self.shape = board.shape
+            frame, wait = (generation, None, changes.copy()), True
+        else:
+            frame = (generation, board.copy(), None)
+        if self.error is None:
+            if wait:
+                if self._put(frame):
+                    return True
+            else:
+                try:
+                    self.frames.put_nowait(frame)
+                    return True
+                except queue.Full:
+                    pass
+        self.dropped += 1
+        return False
+
+    def _put(self, item):
+        # Block for room only while the thread is alive to make it
+        while self.thread.is_alive():
+            try:
+                self.frames.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _run(self):
+        while True:
+            frame = self.frames.get()
+            if frame is None:
+                return
+            try:
+                self.write(*frame)
+            except Exception as error:
+                # Kept for close(); the thread stops taking frames
+                self.error = error
+                return
+            self.written += 1
+
+    def write(self, generation, board, changes=None):
+        if self.format == "text":
+            sys.stdout.write(f"\nCurrent Grid State (generation {generation}):\n{format_grid(board)}\n")
+            sys.stdout.flush()
+        elif self.format == "npz":
+            np.savez_compressed(self.path.replace("{generation}", str(generation)),
+                                board=board, generation=generation)
+        elif self.format == "png":
+            with open(self.path.replace("{generation}", str(generation)), "wb") as f:
+                f.write(encode_png(board))
+        elif self.format == "rle":
+            self.log.write(encode_rle(board, f"generation {generation}"))
+            self.log.flush()
+        else:
+            if not self.written:
+                self.log.write("#delta {} {}\n".format(*self.shape))
+            self.log.write(" ".join(map(str, [generation] + changes.tolist())) + "\n")
+            self.log.flush()
+
+    def close(self):
+        """
+        Write the frames still queued and stop the thread. Returns (frames
+        written, frames dropped), or raises the error that stopped the
+        writer.
+        """
+        self._put(None)
+        self.thread.join()
+        if self.log is not None:
+            self.log.close()
+        if self.error is not None:
+            raise self.error
+        return self.written, self.dropped
+
+
+def halo_tag(direction):
+    """
+    Tag of a halo message traveling in direction.
+    """
+    return DIRECTIONS.index(direction)
+
+
+def split_extent(extent, parts):
+    """
+    Split extent cells into parts nearly equal blocks; the first
+    extent % parts blocks get one extra cell. Returns (counts, offsets).
+    """
+    base, extra = divmod(extent, parts)
+    counts = [base + (1 if i < extra else 0) for i in range(parts)]
+    offsets = [sum(counts[:i]) for i in range(parts)]
+    return counts, offsets
+
+
+class Decomposition:
+    """
+    Block decomposition of the global grid over a 2D Cartesian communicator.
+
+    Rows are split over dims[0] process rows and columns over dims[1]
+    process columns, with uneven blocks when the grid does not divide. The
+    column dimension is periodic (the board wraps left-right); the row
+    dimension is not, so halos past the top and bottom stay dead.
+
+    Every rank holds its tile padded by halo rows and col_halo columns on
+    each side. Packed grids use col_halo=0 and whole rows (dims[1] == 1), and
+    global_cols then counts words rather than cells.
+
+    row_counts, when given, sets the rows of every process row instead of
+    an even split (see balance_rows).
+    """
+
+    def __init__(self, comm, global_rows, global_cols, mpi_type, dims=(0, 0), halo=1, col_halo=None,
+                 row_counts=None):
+        self.global_rows = global_rows
+        self.global_cols = global_cols
+        self.mpi_type = mpi_type
+        self.halo = halo
+        self.col_halo = halo if col_halo is None else col_halo
+
+        if self.col_halo == 0 and dims[1] == 0:
+            dims = (dims[0], 1)
+        fixed = int(np.prod([d for d in dims if d > 0]))
+        if comm.Get_size() % fixed or (0 not in dims and fixed != comm.Get_size()):
+            raise ValueError(f"Process grid {dims[0]}x{dims[1]} does not fit {comm.Get_size()} processes")
+        self.dims = MPI.Compute_dims(comm.Get_size(), list(dims))
+        if self.col_halo == 0 and self.dims[1] != 1:
+            raise ValueError("A grid without column halos must be split into whole rows (dims[1] == 1)")
+        self.cart = comm.Create_cart(self.dims, periods=[False, True], reorder=False)
+        self.rank = self.cart.Get_rank()
+        self.size = self.cart.Get_size()
+        self.coords = self.cart.Get_coords(self.rank)
+
+        if row_counts is None:
+            self.row_counts, self.row_offsets = split_extent(global_rows, self.dims[0])
+        else:
+            if len(row_counts) != self.dims[0] or sum(row_counts) != global_rows:
+                raise ValueError(f"Row counts {list(row_counts)} do not split {global_rows} rows "
+                                 f"over {self.dims[0]} process rows")
+            self.row_counts = [int(count) for count in row_counts]
+            self.row_offsets = [sum(self.row_counts[:i]) for i in range(self.dims[0])]
+        self.col_counts, self.col_offsets = split_extent(global_cols, self.dims[1])
+        if min(self.row_counts) < halo or min(self.col_counts) < max(self.col_halo, 1):
+            raise ValueError(
+                f"Grid {global_rows}x{global_cols} is too small for {self.dims[0]}x{self.dims[1]} "
+                f"tiles with a halo of {halo}"
+            )
+
+        self.row0, self.rows, self.col0, self.cols = self.tile(self.rank)
+        self.shape = (self.rows + 2 * halo, self.cols + 2 * self.col_halo)
+
+        # Neighbor rank in each direction; off the top or bottom is PROC_NULL
+        self.neighbors = {}
+        for direction in DIRECTIONS:
+            row = self.coords[0] + direction[0]
+            col = self.coords[1] + direction[1]
+            if 0 <= row < self.dims[0]:
+                self.neighbors[direction] = self.cart.Get_cart_rank([row, col])
+            else:
+                self.neighbors[direction] = MPI.PROC_NULL
+
+        # Derived datatypes describing regions of the padded local grid
+        self._types = []
+        self._region_types = {}
+        self._tiles = None
+        self.interior_type = self._subarray(halo, self.rows, self.col_halo, self.cols)
+        self.counts = [self.tile(r)[1] * self.tile(r)[3] for r in range(self.size)]
+        self.displs = [sum(self.counts[:r]) for r in range(self.size)]
+
+    def tile(self, rank):
+        """
+        Return (row0, rows, col0, cols) of the tile owned by rank.
+        """
+        coords = self.cart.Get_coords(rank)
+        return (self.row_offsets[coords[0]], self.row_counts[coords[0]],
+                self.col_offsets[coords[1]], self.col_counts[coords[1]])
+
+    def interior(self, local_grid):
+        """
+        View of the cells this rank owns, without halos.
+        """
+        return local_grid[self.halo:self.halo + self.rows,
+                          self.col_halo:self.col_halo + self.cols]
+
+    def allocate(self, dtype):
+        """
+        Allocate a zeroed padded local grid.
+        """
+        return np.zeros(self.shape, dtype=dtype)
+
+    def _subarray(self, row_start, rows, col_start, cols):
+        datatype = self.mpi_type.Create_subarray(
+            list(self.shape), [rows, cols], [row_start, col_start]
+        ).Commit()
+        self._types.append(datatype)
+        return datatype
+
+    def region(self, direction, send):
+        """
+        Slices of the padded local grid holding the cells sent toward
+        direction (send=True), or the halo received from the neighbor in
+        that direction.
+        """
+        spans = []
+        for offset, halo, count in ((direction[0], self.halo, self.rows),
+                                    (direction[1], self.col_halo, self.cols)):
+            if offset == 0:
+                start, length = halo, count
+            elif offset < 0:
+                start, length = (halo if send else 0), halo
+            else:
+                start, length = (count if send else count + halo), halo
+            spans.append(slice(start, start + length))
+        return tuple(spans)
+
+    def region_type(self, direction, send):
+        """
+        Subarray datatype matching region(direction, send).
+        """
+        key = (direction, send)
+        if key not in self._region_types:
+            rows, cols = self.region(direction, send)
+            self._region_types[key] = self._subarray(
+                rows.start, rows.stop - rows.start, cols.start, cols.stop - cols.start)
+        return self._region_types[key]
+
+    def halo_directions(self):
+        """
+        Directions that carry halos: all eight, or only up and down for
+        grids without column halos.
+        """
+        return [d for d in DIRECTIONS if d[1] == 0 or self.col_halo > 0]
+
+    def halo_requests(self, local_grid):
+        """
+        Create persistent requests exchanging every halo of local_grid
+        (edges and corners) with the eight neighbors.
+        """
+        receives, sends = [], []
+        for direction in self.halo_directions():
+            receives.append(self.cart.Recv_init(
+                [local_grid, 1, self.region_type(direction, send=False)],
+                source=self.neighbors[direction], tag=halo_tag((-direction[0], -direction[1]))))
+            sends.append(self.cart.Send_init(
+                [local_grid, 1, self.region_type(direction, send=True)],
+                dest=self.neighbors[direction], tag=halo_tag(direction)))
+        return receives + sends
+
+    def gather(self, local_grid, root=0, out=None):
+        """
+        Gather the interiors of every rank's local_grid into a global grid
+        on root (None elsewhere). Root reuses out when it is given.
+        """
+        tiles = None
+        if self.rank == root:
+            if self._tiles is None or self._tiles.dtype != local_grid.dtype:
+                self._tiles = np.empty(sum(self.counts), dtype=local_grid.dtype)
+            tiles = self._tiles
+        self.cart.Gatherv(
+            [local_grid, 1, self.interior_type],
+            [tiles, self.counts, self.displs, self.mpi_type] if self.rank == root else None,
+            root=root,
+        )
+        if self.rank != root:
+            return None
+        grid = out
+        if grid is None:
+            grid = np.empty((self.global_rows, self.global_cols), dtype=local_grid.dtype)
+        for r in range(self.size):
+            row0, rows, col0, cols = self.tile(r)
+            grid[row0:row0 + rows, col0:col0 + cols] = (
+                tiles[self.displs[r]:self.displs[r] + self.counts[r]].reshape(rows, cols))
+        return grid
+
+    def free(self):
+        """
+        Release the derived datatypes and the Cartesian communicator.
+        """
+        for datatype in self._types:
+            datatype.Free()
+        self._types = []
+        self._region_types = {}
+        self.cart.Free()
+
+
+def balance_rows(costs, counts, min_rows=1):
+    """
+    Split the rows again so that every strip gets the same share of the
+    measured cost. costs[r] is the compute time of the strip of counts[r]
+    rows, taken to be spread evenly over its rows. Every strip keeps at least
+    min_rows rows. Returns the new row counts.
+    """
+    parts = len(counts)
+    total = sum(counts)
+    per_row = np.repeat(np.asarray(costs, dtype=float) / np.asarray(counts), counts)
+    cumulative = np.concatenate(([0.0], np.cumsum(per_row)))
+    targets = cumulative[-1] * np.arange(1, parts) / parts
+    bounds = [0]
+    for i, bound in enumerate(np.searchsorted(cumulative, targets).tolist(), start=1):
+        bound = max(bound, bounds[-1] + min_rows)
+        bounds.append(min(bound, total - (parts - i) * min_rows))
+    bounds.append(total)
+    return [stop - start for start, stop in zip(bounds, bounds[1:])]
+
+
+def migrate_rows(old_domain, new_domain, old_cells, new_cells):
+    """
+    Move the rows of a row-strip decomposition to their new owners with one
+    Alltoallv. old_cells and new_cells are this rank's interior cells under
+    the old and the new domain.
+    """
+    size = old_domain.size
+    width = old_domain.cols
+    old_start, old_stop = old_domain.row0, old_domain.row0 + old_domain.rows
+    new_start, new_stop = new_domain.row0, new_domain.row0 + new_domain.rows
+
+    def overlap(start, stop, other):
+        row0, rows = other
+        return max(0, min(stop, row0 + rows) - max(start, row0)), max(start, row0)
+
+    send_counts, send_displs, recv_counts, recv_displs = [], [], [], []
+    for r in range(size):
+        rows, first = overlap(old_start, old_stop, new_domain.tile(r)[:2])
+        send_counts.append(rows * width)
+        send_displs.append((first - old_start) * width if rows else 0)
+        rows, first = overlap(new_start, new_stop, old_domain.tile(r)[:2])
+        recv_counts.append(rows * width)
+        recv_displs.append((first - new_start) * width if rows else 0)
+
+    send = np.ascontiguousarray(old_cells)
+    receive = np.empty((new_domain.rows, width), dtype=old_cells.dtype)
+    old_domain.cart.Alltoallv([send, send_counts, send_displs, old_domain.mpi_type],
+                              [receive, recv_counts, recv_displs, old_domain.mpi_type])
+    new_cells[...] = receive
+
+
+def overlap_blocks(rows, cols, col_halo):
+    """
+    Split a padded tile of rows x cols owned cells into the block that can be
+    updated before the halos arrive and the frame that needs them. Blocks
+    are (row_start, row_stop, col_start, col_stop) in padded coordinates.
+    """
+    if col_halo == 0:
+        # Packed rows wrap their columns internally; only rows need halos
+        inner = (2, rows, 0, cols)
+        frame = [(1, 2, 0, cols), (max(2, rows), rows + 1, 0, cols)]
+        return inner, frame
+    inner = (2, rows, 2, cols)
+    frame = [
+        (1, 2, 1, cols + 1),
+        (max(2, rows), rows + 1, 1, cols + 1),
+        (2, rows, 1, 2),
+        (2, rows, max(2, cols), cols + 1),
+    ]
+    return inner, frame
+
+
+def clear_outer_halos(domain, local_grid):
+    """
+    Kill the halo rows that lie past the top or bottom of the board. Deep
+    halo steps compute into them, but those cells must stay dead.
+    """
+    if domain.coords[0] == 0:
+        local_grid[:domain.halo] = DEAD
+    if domain.coords[0] == domain.dims[0] - 1:
+        local_grid[domain.halo + domain.rows:] = DEAD
+
+
+def dilate_tiles(mask):
+    """
+    Grow a tile bitmap by one tile in every direction (3x3 neighborhood).
+    """
+    grown = mask.copy()
+    grown[1:] |= mask[:-1]
+    grown[:-1] |= mask[1:]
+    spread = grown.copy()
+    spread[:, 1:] |= grown[:, :-1]
+    spread[:, :-1] |= grown[:, 1:]
+    return spread
+
+
+class ActiveTiles:
+    """
+    Change bitmap over fixed tile_size x tile_size tiles of a rank's cells.
+
+    A tile is recomputed only when it, one of its neighbor tiles, or the
+    halo next to it changed in the previous generation; every other tile
+    already holds its next state in the second buffer. Halo messages for an
+    edge whose tiles did not change are sent empty, and the receiver reuses
+    the halo it got the generation before.
+    """
+
+    def __init__(self, domain, tile_size=64):
+        if domain.col_halo == 0:
+            raise ValueError("Active tile tracking needs a grid with column halos (not packed)")
+        self.domain = domain
+        self.tile_size = tile_size
+        self.tile_rows = -(-domain.rows // tile_size)
+        self.tile_cols = -(-domain.cols // tile_size)
+
+        # Everything counts as changed before the first generation
+        self.changed = np.ones((self.tile_rows, self.tile_cols), dtype=bool)
+        self.halo_changed = np.zeros_like(self.changed)
+        self.updated_tiles = 0
+
+    def edge(self, direction):
+        """
+        Index into the tile bitmap of the tiles along the edge facing direction.
+        """
+        return tuple(slice(0, 1) if offset < 0 else slice(-1, None) if offset > 0 else slice(None)
+                     for offset in direction)
+
+    def exchange(self, local_grid, previous_grid):
+        """
+        Exchange halos for local_grid, skipping edges that did not change.
+        previous_grid holds the previous generation and its halos.
+        """
+        domain = self.domain
+        directions = domain.halo_directions()
+        requests = []
+        for direction in directions:
+            requests.append(domain.cart.Irecv(
+                [local_grid, 1, domain.region_type(direction, send=False)],
+                source=domain.neighbors[direction], tag=halo_tag((-direction[0], -direction[1]))))
+        for direction in directions:
+            count = 1 if self.changed[self.edge(direction)].any() else 0
+            requests.append(domain.cart.Isend(
+                [local_grid, count, domain.region_type(direction, send=True)],
+                dest=domain.neighbors[direction], tag=halo_tag(direction)))
+        statuses = [MPI.Status() for _ in requests]
+        MPI.Request.Waitall(requests, statuses)
+
+        self.halo_changed[:] = False
+        for direction, status in zip(directions, statuses):
+            if status.Get_count(domain.region_type(direction, send=False)) > 0:
+                self.halo_changed[self.edge(direction)] = True
+            else:
+                halo = domain.region(direction, send=False)
+                local_grid[halo] = previous_grid[halo]
+
+    def step(self, local_grid, new_grid):
+        """
+        Update the active tiles of local_grid into new_grid and record which
+        of them changed.
+        """
+        domain, size = self.domain, self.tile_size
+        active = dilate_tiles(self.changed) | self.halo_changed
+        changed = np.zeros_like(self.changed)
+        self.updated_tiles = int(active.sum())
+
+        for tile_row in np.flatnonzero(active.any(axis=1)):
+            row_start = domain.halo + tile_row * size
+            row_stop = min(row_start + size, domain.halo + domain.rows)
+
+            # Update each run of consecutive active tiles in one call
+            flags = np.concatenate(([False], active[tile_row], [False]))
+            edges = np.flatnonzero(flags[1:] != flags[:-1])
+            for first, last in zip(edges[::2], edges[1::2]):
+                col_start = domain.col_halo + first * size
+                col_stop = min(domain.col_halo + last * size, domain.col_halo + domain.cols)
+                update_block(local_grid, new_grid, row_start, row_stop, col_start, col_stop)
+
+                block = (slice(row_start, row_stop), slice(col_start, col_stop))
+                differs = (new_grid[block] != local_grid[block]).any(axis=0)
+                tile_starts = np.arange(0, col_stop - col_start, size)
+                changed[tile_row, first:last] = np.logical_or.reduceat(differs, tile_starts)
+
+        self.changed = changed
+
+
+class DeltaGather:
+    """
+    Ships only the cells that changed since the last output to root.
+
+    Every rank keeps a copy of its cells as last shipped and sends the
+    global indices (row * cols + col) of the cells that differ; root
+    toggles those cells in its own copy of the whole board. cols counts
+    cells even for packed grids.
+    """
+
+    def __init__(self, domain, local_grid, cols, packed=False, initial=None, root=0):
+        self.domain = domain
+        self.cols = cols
+        self.packed = packed
+        self.root = root
+        self.last = domain.interior(local_grid).copy()
+        self.grid = initial.copy() if domain.rank == root else None
+
+    def changed_cells(self, local_grid):
+        """
+        Global indices of the cells of this rank that changed since the last
+        call, as int64.
+        """
+        domain = self.domain
+        current = domain.interior(local_grid)
+        if self.packed:
+            flips = current ^ self.last
+            rows, words = np.nonzero(flips)
+            bits = (flips[rows, words][:, None] >> np.arange(WORD_BITS, dtype=WORD_DTYPE)) & WORD_DTYPE(1)
+            hit_rows, hit_bits = np.nonzero(bits)
+            rows = rows[hit_rows]
+            cols = (domain.col0 + words[hit_rows]) * WORD_BITS + hit_bits
+        else:
+            rows, cols = np.nonzero(current != self.last)
+            cols = cols + domain.col0
+        self.last[...] = current
+        return (rows.astype(np.int64) + domain.row0) * self.cols + cols.astype(np.int64)
+
+    def gather(self, local_grid):
+        """
+        Collect every rank's changes on root and apply them to root's board.
+        Returns (board, changed cell indices) on root, (None, None) elsewhere.
+        """
+        cart = self.domain.cart
+        changes = self.changed_cells(local_grid)
+        counts = cart.gather(len(changes), root=self.root)
+        if cart.Get_rank() == self.root:
+            merged = np.empty(sum(counts), dtype=np.int64)
+            cart.Gatherv(changes, [merged, counts, None, MPI.INT64_T], root=self.root)
+            self.grid.flat[merged] ^= ALIVE
+            return self.grid, merged
+        cart.Gatherv(changes, None, root=self.root)
+        return None, None
+
+
+def read_checkpoint_header(comm, path):
+    """
+    Read a checkpoint header on rank 0 and share it with every rank.
+    Returns a dict with packed, rows, cols, width and generation.
+    """
+    header = None
+    if comm.Get_rank() == 0:
+        with open(path, "rb") as f:
+            fields = CHECKPOINT_HEADER.unpack(f.read(CHECKPOINT_HEADER.size))
+        magic, version, packed, rows, cols, width, generation = fields
+        if magic != CHECKPOINT_MAGIC or version != CHECKPOINT_VERSION:
+            header = f"{path} is not a version {CHECKPOINT_VERSION} Game of Life checkpoint"
+        else:
+            header = {"packed": bool(packed), "rows": rows, "cols": cols,
+                      "width": width, "generation": generation}
+    header = comm.bcast(header, root=0)
+    if isinstance(header, str):
+        raise ValueError(header)
+    return header
+
+
+def _tile_filetype(domain):
+    """
+    File view type selecting this rank's tile of the global grid.
+    """
+    return domain.mpi_type.Create_subarray(
+        [domain.global_rows, domain.global_cols], [domain.rows, domain.cols],
+        [domain.row0, domain.col0]).Commit()
+
+
+def write_checkpoint(path, domain, local_grid, generation, cols, packed=False):
+    """
+    Write the whole grid to path with collective MPI-IO: every rank writes
+    its own tile at its offset in the file, straight from local_grid.
+
+    The file is written next to path and renamed over it once complete, so
+    an interrupted write never clobbers the previous checkpoint.
+    """
+    cart = domain.cart
+    partial = path + ".partial"
+    data_size = domain.global_rows * domain.global_cols * domain.mpi_type.Get_size()
+
+    fh = MPI.File.Open(cart, partial, MPI.MODE_WRONLY | MPI.MODE_CREATE)
+    fh.Set_size(CHECKPOINT_HEADER_SIZE + data_size)
+    if domain.rank == 0:
+        header = CHECKPOINT_HEADER.pack(CHECKPOINT_MAGIC, CHECKPOINT_VERSION, int(packed),
+                                        domain.global_rows, cols, domain.global_cols, generation)
+        fh.Write_at(0, np.frombuffer(header.ljust(CHECKPOINT_HEADER_SIZE, b"\0"), dtype=np.uint8))
+
+    filetype = _tile_filetype(domain)
+    fh.Set_view(CHECKPOINT_HEADER_SIZE, domain.mpi_type, filetype)
+    fh.Write_all([local_grid, 1, domain.interior_type])
+    fh.Close()
+    filetype.Free()
+
+    if domain.rank == 0:
+        os.replace(partial, path)
+
+
+def read_checkpoint(path, domain, local_grid):
+    """
+    Read this rank's tile of a checkpoint into the interior of local_grid
+    with collective MPI-IO. No rank reads more than its own tile.
+    """
+    fh = MPI.File.Open(domain.cart, path, MPI.MODE_RDONLY)
+    filetype = _tile_filetype(domain)
+    fh.Set_view(CHECKPOINT_HEADER_SIZE, domain.mpi_type, filetype)
+    fh.Read_all([local_grid, 1, domain.interior_type])
+    fh.Close()
+    filetype.Free()
+
+
+def open_checkpoint(path):
+    """
+    Memory-map a checkpoint as a (rows, width) array without MPI.
+    Packed checkpoints hold uint64 words; unpack them with unpack_grid.
+    """
+    with open(path, "rb") as f:
+        magic, version, packed, rows, cols, width, generation = CHECKPOINT_HEADER.unpack(
+            f.read(CHECKPOINT_HEADER.size))
+    if magic != CHECKPOINT_MAGIC or version != CHECKPOINT_VERSION:
+        raise ValueError(f"{path} is not a version {CHECKPOINT_VERSION} Game of Life checkpoint")
+    dtype = WORD_DTYPE if packed else CELL_DTYPE
+    return np.memmap(path, dtype=dtype, mode="r", offset=CHECKPOINT_HEADER_SIZE, shape=(rows, width))
+
+
+class ControlChannel:
+    """
+    Carries stop, pause, checkpoint and output commands to every rank
+    without a blocking collective on the hot path.
+
+    Any rank may request() a command; on rank 0 a listener thread turns
+    lines typed on the terminal into requests. Every `every` generations
+    poll() waits for the MPI_BOR Iallreduce posted at the previous poll
+    (long done by then, so the wait is free) and posts the next one with the
+    commands requested since. All ranks see the same commands at the same
+    generation, at most 2 * every generations after they were requested.
+    While paused, the ranks meet in a blocking allreduce a few times a
+    second until a second pause command arrives.
+    """
+
+    def __init__(self, comm, every=8, listen=False):
+        if every < 1:
+            raise ValueError(f"Control channel must be polled every 1 or more generations, not {every}")
+        self.comm = comm
+        self.every = every
+        self.lock = threading.Lock()
+        self.pending = 0
+        self.stopped = False
+        self.send = np.zeros(1, dtype=np.int32)
+        self.recv = np.zeros(1, dtype=np.int32)
+        self.request_in_flight = None
+        if listen:
+            threading.Thread(target=self._listen, daemon=True).start()
+
+    def request(self, command):
+        with self.lock:
+            self.pending |= command
+
+    def _take(self):
+        with self.lock:
+            command, self.pending = self.pending, 0
+        return command
+
+    def _listen(self):
+        print("Press Enter to stop the game, p and Enter to pause or resume, "
+              "c and Enter to checkpoint, o and Enter to show the board...")
+        while True:
+            try:
+                line = input().strip().lower()
+            except EOFError:
+                return
+            command = CONTROL_KEYS.get(line)
+            if command is None:
+                print(f"Unknown command {line!r}")
+                continue
+            self.request(command)
+            if command == CONTROL_STOP:
+                return
+
+    def poll(self, generation):
+        """
+        Return the commands every rank agreed on, or 0 if this is not a
+        polling generation. Pauses happen inside poll, so only STOP,
+        CHECKPOINT and OUTPUT are returned.
+        """
+        if self.stopped or generation % self.every:
+            return 0
+        commands = 0
+        if self.request_in_flight is not None:
+            self.request_in_flight.Wait()
+            self.request_in_flight = None
+            commands = int(self.recv[0])
+        if commands & CONTROL_PAUSE:
+            commands = (commands & ~CONTROL_PAUSE) | self._paused(generation)
+        if commands & CONTROL_STOP:
+            self.stopped = True
+        else:
+            self.send[0] = self._take()
+            self.request_in_flight = self.comm.Iallreduce(self.send, self.recv, op=MPI.BOR)
+        return commands
+
+    def _paused(self, generation):
+        if self.comm.Get_rank() == 0:
+            print(f"Paused at generation {generation}.")
+        commands = 0
+        while True:
+            time.sleep(CONTROL_PAUSE_POLL)
+            self.send[0] = self._take()
+            self.comm.Allreduce(self.send, self.recv, op=MPI.BOR)
+            commands |= int(self.recv[0])
+            if commands & (CONTROL_PAUSE | CONTROL_STOP):
+                if self.comm.Get_rank() == 0 and not commands & CONTROL_STOP:
+                    print("Resumed.")
+                return commands & ~CONTROL_PAUSE
+
+    def close(self):
+        """
+        Complete the request still in flight; every rank must call this.
+        """
+        if self.request_in_flight is not None:
+            self.request_in_flight.Wait()
+            self.request_in_flight = None
+
+
+class CycleDetector:
+    """
+    Notices when the board repeats an earlier generation, i.e. it has become
+    a still life (period 1, including an empty board) or an oscillator.
+
+    Every generation each rank hashes its own cells (64-bit BLAKE2b, salted
+    with the tile position). Every check_every generations the batch of
+    hashes is XORed across ranks in one Allreduce, so the cost on the hot
+    path is one small collective per batch. Global hashes are kept for the
+    last `history` generations; a repeat within that window gives the
+    period.
+    """
+
+    def __init__(self, domain, check_every=16, history=64):
+        self.domain = domain
+        self.check_every = check_every
+        self.history = history
+        self.salt = struct.pack("<QQ", domain.row0, domain.col0)
+        self.pending = []
+        self.seen = {}
+        self.order = collections.deque()
+        self.cycle = None
+
+    def record(self, local_grid, generation):
+        """
+        Hash this rank's cells at the given generation. Returns the cycle as
+        (first generation, period) once it has been found, else None;
+        every rank gets the same answer at the same generation.
+        """
+        cells = self.domain.interior(local_grid).tobytes()
+        digest = hashlib.blake2b(cells, digest_size=8, salt=self.salt).digest()
+        self.pending.append((generation, int.from_bytes(digest, "little")))
+        if len(self.pending) >= self.check_every:
+            self._check()
+        return self.cycle
+
+    def _check(self):
+        local = np.array([value for _, value in self.pending], dtype=np.uint64)
+        combined = np.empty_like(local)
+        self.domain.cart.Allreduce(local, combined, op=MPI.BXOR)
+        for (generation, _), value in zip(self.pending, combined.tolist()):
+            first = self.seen.get(value)
+            if first is not None and self.cycle is None:
+                self.cycle = (first, generation - first)
+            self.seen[value] = generation
+            self.order.append((value, generation))
+            if len(self.order) > self.history:
+                old, old_generation = self.order.popleft()
+                if self.seen.get(old) == old_generation:
+                    del self.seen[old]
+        self.pending = []
+
+
+PHASES = ("halo", "compute", "barrier", "gather", "checkpoint", "control", "hash", "balance")
+
+# Rows are split again when the slowest rank computed this much longer
+# than the mean since the last check
+REBALANCE_THRESHOLD = 1.1
+
+
+def raise_shared(comm, error, root=0):
+    """
+    Raise on every rank of comm when root hit error (None on the other
+    ranks): root re-raises it and the others raise RuntimeError, so no rank
+    is left waiting in a collective for one that gave up.
+    """
+    message = comm.bcast(None if error is None else f"{type(error).__name__}: {error}", root=root)
+    if error is not None:
+        raise error
+    if message is not None:
+        raise RuntimeError(f"Rank {root} failed: {message}")
+
+
+def run_game(comm, global_rows=20, global_cols=20, generations=None, time_step=0.0, show=True,
+             pattern="plus", density=0.25, seed=None, packed=False, overlap=False, barrier=None,
+             barrier_algorithm="tree",
+             dims=(0, 0), active=False, tile_size=64, output="frames", output_every=1,
+             checkpoint=None, checkpoint_every=0, restart=None, halo_depth=1, keep_board=False,
+             frames="-", frame_queue=4, control_every=8, cycle_check=0, cycle_history=64,
+             on_cycle="stop", rebalance_every=0):
+    """
+    Run the Game of Life on comm for the given number of generations, or
+    until the user stops it when generations is None. Returns run statistics
+    (the same on every rank): wall time, cell updates per second and the
+    time spent in each phase, as the max and mean over ranks.
+
+    Every rank builds its own tile of the initial board from pattern,
+    density and seed (see initialize_tile); nothing is scattered.
+
+    The grid is split into tiles over a dims[0] x dims[1] process grid
+    (MPI.Compute_dims fills in zeros); packed grids are split into whole
+    rows. With overlap=True the halos travel through persistent
+    Isend/Irecv requests while the inside of each tile is updated, and the
+    frame around it is finished after Waitall. The barrier before each
+    update is only run when barrier is true (by default only for the
+    blocking exchange); barrier_algorithm names the MPI barrier from the
+    barriers registry (the tree barrier by default).
+
+    With active=True only tiles near last generation's changes are
+    recomputed (see ActiveTiles); this uses the blocking exchange and the
+    unpacked grid.
+
+    halo_depth=k keeps k rows (and columns) of halo: the halos are exchanged
+    once, then every rank advances k generations on its own over a region
+    that shrinks by one cell per generation. That trades a little redundant
+    compute for k times fewer messages and barriers; each tile must be at
+    least k cells on a side. It uses the blocking exchange.
+
+    With show=True, rank 0 hands the board to a FrameWriter every
+    output_every generations, or only once the game stops when output_every
+    is 0, and sleeps time_step after each frame. frames picks where the
+    writer puts them (the terminal by default) and frame_queue how many
+    frames may wait before new ones are dropped. output="frames" gathers the
+    whole grid, output="delta" only the cells that changed since the last
+    output (see DeltaGather), which a *.delta frame log records as they are.
+
+    With checkpoint set, the grid is saved there with collective MPI-IO every
+    checkpoint_every generations and when the game stops; "{generation}" in
+    the path is replaced by the generation number. restart resumes from
+    such a file, which then decides the grid size and the packed mode.
+
+    Stop, pause, checkpoint and output commands reach every rank through a
+    ControlChannel polled every control_every generations; when generations
+    is None, rank 0 reads them from the terminal. Checkpoints asked for that
+    way go to checkpoint, or DEFAULT_CHECKPOINT without one, and an output
+    command shows the board at that generation whatever output_every is.
+
+    With cycle_check=K, a CycleDetector compares the board with the last
+    cycle_history generations every K generations. Once the board repeats,
+    on_cycle="stop" ends the run there, and on_cycle="skip" jumps ahead by
+    whole periods and runs only the generations that are left; the cycle is
+    returned as "cycle" (first generation, period) and the generations
+    jumped over as "skipped", which "generations" and the cell update rate
+    leave out.
+
+    With rebalance_every=N the board is split into row strips (dims[1] must
+    be 0 or 1) and every N generations the ranks compare the compute time they spent
+    since the last check. If the slowest rank took more than
+    REBALANCE_THRESHOLD times the mean, the rows are split again by
+    measured cost (see balance_rows) and moved to their new owners; the
+    halos, gathers and trackers follow the new split.
+
+    With keep_board=True the final board is gathered and returned on rank 0
+    under "board" (see verify_run).
+    """
     rank = comm.Get_rank()
     numprocs = comm.Get_size()
 
-    # Grid dimensions
-    global_rows, global_cols = 20, 20
+    generation = 0
+    if restart is not None:
+        header = read_checkpoint_header(comm, restart)
+        if header["packed"] != packed:
+            raise ValueError(f"{restart} was written {'with' if header['packed'] else 'without'} packed mode")
+        global_rows, global_cols = header["rows"], header["cols"]
+        generation = header["generation"]
+    last_generation = None if generations is None else generation + generations
 
-    # Get the time step from user input (on rank 0 only)
-    if rank == 0:
-        try:
-            time_step = float(input("Enter the time step (in seconds) between updates: "))
-        except ValueError:
-            print("Invalid input. Defaulting to 0.5 seconds.")
-            time_step = 0.5
-    else:
-        time_step = None
+    if active and (packed or overlap):
+        raise ValueError("Active tile tracking cannot be combined with packed or overlap mode")
+    if active and tile_size < 1:
+        raise ValueError(f"Tile size must be at least 1, not {tile_size}")
+    if halo_depth < 1:
+        raise ValueError(f"Halo depth must be at least 1, not {halo_depth}")
+    if halo_depth > 1 and (active or overlap):
+        raise ValueError("Deep halos cannot be combined with active or overlap mode")
+    if output not in ("frames", "delta"):
+        raise ValueError(f"Unknown output mode: {output}")
+    if on_cycle not in ("stop", "skip"):
+        raise ValueError(f"Unknown cycle action: {on_cycle}")
+    if rebalance_every and dims[1] > 1:
+        raise ValueError(f"Rebalancing needs row strips (one process column), not {dims[1]} columns")
 
-    # Broadcast the time step to all processes
-    time_step = comm.bcast(time_step, root=0)
+    # Rebalancing moves whole rows
+    if rebalance_every:
+        dims = (dims[0], 1)
 
-    # Number of rows per process (including halo rows)
-    local_rows = (global_rows // numprocs) + 2
-    cols = global_cols
+    # In packed mode the local grid, the halos and the gathers all
+    # hold 64-cell words instead of single cells, split into whole rows
+    def decompose(row_counts=None):
+        if packed:
+            return Decomposition(comm, global_rows, packed_width(global_cols), MPI_WORD,
+                                 dims=(dims[0], 1), halo=halo_depth, col_halo=0, row_counts=row_counts)
+        return Decomposition(comm, global_rows, global_cols, MPI_CELL, dims=dims, halo=halo_depth,
+                             row_counts=row_counts)
 
-    # Initialize grid
-    if rank == 0:
-        grid = initialize_grid(global_rows, global_cols)
-    else:
-        grid = None
-
-    # Scatter grid among processes
-    local_grid = np.zeros((local_rows, cols), dtype=int)
-    comm.Scatterv(
-        [grid, (global_rows // numprocs) * cols, None, MPI.INT],
-        local_grid[1:-1, :],
-        root=0
-    )
+    domain = decompose()
+    if packed:
+        dtype = WORD_DTYPE
 
-    # Start the listener thread to stop the game (AFTER initialization)
-    if rank == 0:
-        threading.Thread(target=stop_game_listener, daemon=True).start()
+        def step_block(grid, new_grid, row_start, row_stop, col_start, col_stop):
+            update_rows_packed(grid, new_grid, row_start, row_stop, global_cols)
+    else:
+        dtype = CELL_DTYPE
+        step_block = update_block
 
-    while not stop_game:
-        # Send and receive halo rows
-        if rank > 0:
-            comm.Sendrecv(local_grid[1, :], dest=rank - 1, recvbuf=local_grid[0, :], source=rank - 1)
-        if rank < numprocs - 1:
-            comm.Sendrecv(local_grid[-2, :], dest=rank + 1, recvbuf=local_grid[-1, :], source=rank + 1)
+    if barrier is None:
+        barrier = not overlap
+    sync = barriers.create(barrier_algorithm, "mpi", comm)
 
-        # Synchronize processes using tree barrier before updating the grid
-        tree_barrier(rank, numprocs, comm)
+    # Every rank reads or builds only its own tile, so the whole board is
+    # never held on rank 0 or scattered
+    local_grid = domain.allocate(dtype)
+    if restart is not None:
+        read_checkpoint(restart, domain, local_grid)
+    else:
+        if pattern == "random" and seed is None:
+            seed = comm.bcast(np.random.SeedSequence().entropy if rank == 0 else None, root=0)
+        size = None
+        if pattern not in ("plus", "random"):
+            # Measuring a pattern file may mean scanning all of it, so rank 0
+            # does it once for everyone
+            error = None
+            if rank == 0 and os.path.isfile(pattern):
+                try:
+                    size = pattern_size(pattern)
+                except OSError as exc:
+                    error = exc
+            raise_shared(comm, error)
+            size = comm.bcast(size, root=0)
+        if packed:
+            tile = initialize_tile(global_rows, global_cols, domain.row0, domain.row0 + domain.rows,
+                                   0, global_cols, pattern, density, seed, size)
+            domain.interior(local_grid)[...] = pack_grid(tile)
+        else:
+            domain.interior(local_grid)[...] = initialize_tile(
+                global_rows, global_cols, domain.row0, domain.row0 + domain.rows,
+                domain.col0, domain.col0 + domain.cols, pattern, density, seed, size)
 
-        # Update grid
-        new_local_grid = update_grid(local_grid, local_rows, cols)
-        local_grid[:] = new_local_grid
+    # Rank 0 only sees the whole board if it is asked to show it
+    grid = domain.gather(local_grid) if show and output == "delta" else None
+    board = unpack_grid(grid, global_cols) if packed and grid is not None else grid
+    deltas = None
+    if show and output == "delta":
+        deltas = DeltaGather(domain, local_grid, global_cols, packed=packed, initial=board)
 
-        # Synchronize processes using tree barrier before gathering the updated grid
-        tree_barrier(rank, numprocs, comm)
+    # The grid is double-buffered, with one set of persistent halo requests
+    # bound to each buffer
+    next_grid = local_grid.copy()
+    tracker = ActiveTiles(domain, tile_size) if active else None
+    halo_requests = {
+        id(buf): domain.halo_requests(buf) for buf in (local_grid, next_grid)
+    }
+    inner, frame = overlap_blocks(domain.rows, domain.cols, domain.col_halo)
+    since_exchange = halo_depth
+    timings = dict.fromkeys(PHASES, 0.0)
 
-        # Gather the grid on rank 0
+    def show_grid(generation, final=False):
+        nonlocal grid, board
+        start = MPI.Wtime()
+        changes = None
+        if deltas is not None:
+            board, changes = deltas.gather(local_grid)
+        else:
+            grid = domain.gather(local_grid, out=grid)
+            if rank == 0:
+                board = unpack_grid(grid, global_cols) if packed else grid
+        timings["gather"] += MPI.Wtime() - start
         if rank == 0:
-            grid = np.zeros((global_rows, global_cols), dtype=int)
-        comm.Gatherv(local_grid[1:-1, :], [grid, (global_rows // numprocs) * cols, None, MPI.INT], root=0)
+            writer.submit(generation, board, wait=final, changes=changes)
+            time.sleep(time_step)
+
+    def save_checkpoint(generation, path=checkpoint):
+        nonlocal saved
+        path = path.replace("{generation}", str(generation))
+        # The final checkpoint often lands on a periodic one
+        if saved == (path, generation):
+            return
+        start = MPI.Wtime()
+        write_checkpoint(path, domain, local_grid, generation, global_cols, packed=packed)
+        timings["checkpoint"] += MPI.Wtime() - start
+        saved = (path, generation)
+
+    def free_halo_requests():
+        for requests in halo_requests.values():
+            for request in requests:
+                request.Free()
+
+    def rebalance(row_counts):
+        nonlocal domain, local_grid, next_grid, halo_requests, inner, frame, tracker, detector
+        new_domain = decompose(row_counts)
+        new_grid = new_domain.allocate(dtype)
+        migrate_rows(domain, new_domain, domain.interior(local_grid), new_domain.interior(new_grid))
+        if deltas is not None:
+            last = np.empty((new_domain.rows, new_domain.cols), dtype=dtype)
+            migrate_rows(domain, new_domain, deltas.last, last)
+            deltas.domain, deltas.last = new_domain, last
+        free_halo_requests()
+        domain.free()
 
-        # Synchronize processes using tree barrier before printing the grid
-        tree_barrier(rank, numprocs, comm)
+        # The halos of the new grid are filled by the next exchange
+        domain, local_grid, next_grid = new_domain, new_grid, new_grid.copy()
+        halo_requests = {id(buf): domain.halo_requests(buf) for buf in (local_grid, next_grid)}
+        inner, frame = overlap_blocks(domain.rows, domain.cols, domain.col_halo)
+        if tracker is not None:
+            tracker = ActiveTiles(domain, tile_size)
+        if detector is not None:
+            detector = CycleDetector(domain, cycle_check, cycle_history)
+            detector.record(local_grid, generation)
 
-        # Print the grid (on rank 0)
+    saved = None
+    writer = error = None
+    if show and rank == 0:
+        try:
+            writer = FrameWriter(frames, frame_queue, deltas=deltas is not None)
+        except (OSError, ValueError) as exc:
+            error = exc
+    if show:
+        raise_shared(comm, error)
+    if writer is not None and writer.format == "delta":
+        # A delta log starts from the live cells of the first board
+        writer.submit(generation, board, changes=np.flatnonzero(board))
+    rebalance_due = False
+    rebalances = 0
+    compute_mark = 0.0
+
+    detector = None
+    if cycle_check:
+        detector = CycleDetector(domain, cycle_check, cycle_history)
+        detector.record(local_grid, generation)
+    cycle = None
+
+    # Start listening for commands (AFTER initialization)
+    control = ControlChannel(comm, control_every, listen=rank == 0 and last_generation is None)
+
+    # Generations jumped over by on_cycle="skip" are not computed, so they
+    # count neither as run generations nor as cell updates
+    first_generation = generation
+    skipped = 0
+    run_start = MPI.Wtime()
+    while not control.stopped and (last_generation is None or generation < last_generation):
+        start = MPI.Wtime()
+        if tracker is not None:
+            # Only exchange changed edges and update the tiles near changes
+            tracker.exchange(local_grid, next_grid)
+            halo_done = MPI.Wtime()
+            if barrier:
+                sync.wait()
+            barrier_done = MPI.Wtime()
+            tracker.step(local_grid, next_grid)
+            timings["halo"] += halo_done - start
+        elif overlap:
+            requests = halo_requests[id(local_grid)]
+            MPI.Prequest.Startall(requests)
+
+            # Update the cells that do not need halos while they are in
+            # flight, then finish the frame once they have landed
+            step_block(local_grid, next_grid, *inner)
+            inner_done = MPI.Wtime()
+            MPI.Request.Waitall(requests)
+            halo_done = MPI.Wtime()
+            if barrier:
+                sync.wait()
+            barrier_done = MPI.Wtime()
+            for block in frame:
+                step_block(local_grid, next_grid, *block)
+            timings["compute"] += inner_done - start
+            timings["halo"] += halo_done - inner_done
+        else:
+            # Deep halos are only exchanged every halo_depth generations
+            if since_exchange == halo_depth:
+                requests = halo_requests[id(local_grid)]
+                MPI.Prequest.Startall(requests)
+                MPI.Request.Waitall(requests)
+                halo_done = MPI.Wtime()
+
+                # Synchronize processes using tree barrier before updating the grid
+                if barrier:
+                    sync.wait()
+                barrier_done = MPI.Wtime()
+                since_exchange = 0
+            else:
+                halo_done = barrier_done = start
+
+            # Update grid; the valid region shrinks by one cell per
+            # generation since the exchange
+            since_exchange += 1
+            edge = since_exchange if domain.col_halo else 0
+            step_block(local_grid, next_grid, since_exchange, domain.shape[0] - since_exchange,
+                       edge, domain.shape[1] - edge)
+            if halo_depth > 1:
+                clear_outer_halos(domain, next_grid)
+            timings["halo"] += halo_done - start
+        timings["barrier"] += barrier_done - halo_done
+        timings["compute"] += MPI.Wtime() - barrier_done
+
+        local_grid, next_grid = next_grid, local_grid
+        generation += 1
+
+        # Ship the grid to rank 0 and print it; the collective itself keeps
+        # the ranks in step, so no barrier is needed around it
+        shown = show and output_every and generation % output_every == 0
+        if shown:
+            show_grid(generation)
+        if checkpoint and checkpoint_every and generation % checkpoint_every == 0:
+            save_checkpoint(generation)
+
+        # Every rank gets the same commands at the same generation
+        start = MPI.Wtime()
+        commands = control.poll(generation)
+        timings["control"] += MPI.Wtime() - start
+        if commands & CONTROL_CHECKPOINT:
+            save_checkpoint(generation, checkpoint or DEFAULT_CHECKPOINT)
+        if commands & CONTROL_OUTPUT and show and not shown:
+            show_grid(generation)
+
+        if detector is not None:
+            start = MPI.Wtime()
+            cycle = detector.record(local_grid, generation)
+            timings["hash"] += MPI.Wtime() - start
+            if cycle is not None:
+                # The board is periodic from here on
+                detector = None
+                if rank == 0 and show:
+                    print(f"\nThe board repeats every {cycle[1]} generations "
+                          f"from generation {cycle[0]}.")
+                if on_cycle == "stop" or last_generation is None:
+                    break
+                skip = (last_generation - generation) // cycle[1] * cycle[1]
+                generation += skip
+                skipped += skip
+
+        # Rows only move between halo exchanges
+        if rebalance_every and generation % rebalance_every == 0:
+            rebalance_due = True
+        if rebalance_due and since_exchange == halo_depth:
+            rebalance_due = False
+            start = MPI.Wtime()
+            costs = comm.allgather(timings["compute"] - compute_mark)
+            compute_mark = timings["compute"]
+            if max(costs) > REBALANCE_THRESHOLD * sum(costs) / numprocs:
+                row_counts = balance_rows(costs, domain.row_counts, min_rows=halo_depth)
+                if row_counts != domain.row_counts:
+                    rebalance(row_counts)
+                    rebalances += 1
+            timings["balance"] += MPI.Wtime() - start
+    control.close()
+    elapsed = MPI.Wtime() - run_start
+
+    if show and not output_every:
+        show_grid(generation, final=True)
+    frame_counts = error = None
+    if writer is not None:
+        try:
+            frame_counts = writer.close()
+        except Exception as exc:
+            error = exc
+    if show:
+        raise_shared(comm, error)
+    if checkpoint:
+        save_checkpoint(generation)
+    if keep_board:
+        final = domain.gather(local_grid)
         if rank == 0:
-            print("\nCurrent Grid State:")
-            print_grid(grid)
-            time.sleep(time_step)
+            board = unpack_grid(final, global_cols) if packed else final
+
+    free_halo_requests()
+    domain.free()
 
     # Ensure all processes exit cleanly
-    tree_barrier(rank, numprocs, comm)
-    if rank == 0:
+    sync.wait()
+    if rank == 0 and show and control.stopped:
         print("\nGame stopped by user.")
 
+    local_times = np.array([elapsed] + [timings[phase] for phase in PHASES])
+    max_times = np.empty_like(local_times)
+    sum_times = np.empty_like(local_times)
+    comm.Allreduce(local_times, max_times, op=MPI.MAX)
+    comm.Allreduce(local_times, sum_times, op=MPI.SUM)
+    computed = generation - first_generation - skipped
+    updates = global_rows * global_cols * computed
+    return {
+        "processes": numprocs,
+        "rows": global_rows,
+        "cols": global_cols,
+        "generations": computed,
+        "skipped": skipped,
+        "seconds": max_times[0],
+        "cell_updates_per_second": updates / max_times[0] if max_times[0] > 0 else 0.0,
+        "phases": {phase: (max_times[i + 1], sum_times[i + 1] / numprocs)
+                   for i, phase in enumerate(PHASES)},
+        "board": board if keep_board and rank == 0 else None,
+        "frames": frame_counts,
+        "cycle": cycle,
+        "rebalances": rebalances,
+    }
+
+
+def run_hashlife(comm, global_rows=20, global_cols=20, generations=None, time_step=0.0, show=True,
+                 pattern="plus", density=0.25, seed=None, output_every=1, keep_board=False,
+                 frames="-", frame_queue=4):
+    """
+    Run the board with the HashLife engine (see hashlife.py). HashLife holds
+    the whole board, so rank 0 does all the work and the other ranks only
+    wait for the statistics.
+    """
+    from hashlife import HashLife, advance_grid
+
+    stats = error = None
+    if comm.Get_rank() == 0:
+        try:
+            board = initialize_grid(global_rows, global_cols, pattern, density, seed)
+            engine = HashLife()
+            writer = FrameWriter(frames, frame_queue) if show else None
+            if generations is None:
+                threading.Thread(target=stop_game_listener, daemon=True).start()
+            stride = output_every if show and output_every else (generations or 1)
+            generation = 0
+            start = MPI.Wtime()
+            while not stop_game and (generations is None or generation < generations):
+                step = stride if generations is None else min(stride, generations - generation)
+                board = advance_grid(board, step, engine)
+                generation += step
+                if show and (output_every or generation == generations):
+                    writer.submit(generation, board, wait=generation == generations)
+                    time.sleep(time_step)
+            elapsed = MPI.Wtime() - start
+            stats = {
+                "processes": 1,
+                "rows": global_rows,
+                "cols": global_cols,
+                "generations": generation,
+                "seconds": elapsed,
+                "cell_updates_per_second": global_rows * global_cols * generation / elapsed if elapsed > 0 else 0.0,
+                "phases": {"compute": (elapsed, elapsed)},
+                "frames": writer.close() if writer is not None else None,
+            }
+        except Exception as exc:
+            error = exc
+    raise_shared(comm, error)
+    stats = comm.bcast(stats, root=0)
+    stats["board"] = board if keep_board and comm.Get_rank() == 0 else None
+    return stats
+
+
+def verify_run(comm, run, **config):
+    """
+    Run a configuration, then the plain depth-1 stencil path (blocking
+    exchange, unpacked cells, one halo row) from the same start, and compare
+    the final boards on rank 0. The reference runs as far as the checked run
+    got, which is short of generations when it stopped at a cycle. Returns
+    (stats of the checked run, True when the boards match) on every rank.
+    """
+    stats = run(comm, **dict(config, keep_board=True))
+    generations = stats["generations"] + stats.get("skipped", 0)
+    reference = dict(
+        (key, config[key]) for key in ("global_rows", "global_cols", "pattern", "density", "seed",
+                                       "dims") if key in config)
+    reference["generations"] = generations
+    if config.get("restart"):
+        reference.update(restart=config["restart"], packed=config.get("packed", False))
+    expected = run_game(comm, show=False, keep_board=True, **reference)
+
+    matches = None
+    if comm.Get_rank() == 0:
+        differing = int(np.count_nonzero(stats["board"] != expected["board"]))
+        matches = differing == 0
+        if matches:
+            print(f"Verification passed: matches the depth-1 stencil path after {generations} generations")
+        else:
+            print(f"Verification FAILED: {differing} cells differ from the depth-1 stencil path")
+    return stats, comm.bcast(matches, root=0)
+
+
+def print_report(stats):
+    """
+    Print the throughput and per-phase times of one run.
+    """
+    print(f"{stats['processes']} processes, {stats['rows']}x{stats['cols']} grid, "
+          f"{stats['generations']} generations in {stats['seconds']:.6f} s: "
+          f"{stats['cell_updates_per_second']:.3e} cell updates/s")
+    for phase, (longest, mean) in stats["phases"].items():
+        print(f"  {phase:<10} max {longest:.6f} s   mean {mean:.6f} s")
+    if stats.get("cycle"):
+        print(f"  cycle      period {stats['cycle'][1]} from generation {stats['cycle'][0]}")
+    if stats.get("skipped"):
+        print(f"  skipped    {stats['skipped']} generations")
+    if stats.get("rebalances"):
+        print(f"  rebalance  {stats['rebalances']} times")
+    if stats.get("frames"):
+        print(f"  frames     {stats['frames'][0]} written, {stats['frames'][1]} dropped")
+
+
+def scaling_sweep(comm, kind, run, **config):
+    """
+    Run the same benchmark on 1, 2, 4, ... processes of comm (and on all of
+    them). A strong sweep keeps the grid fixed; a weak sweep grows its rows
+    with the process count so every rank keeps the same amount of work.
+    Returns the list of run statistics on rank 0.
+    """
+    rank, size = comm.Get_rank(), comm.Get_size()
+    counts = [1 << i for i in range(size.bit_length()) if (1 << i) < size] + [size]
+    results = []
+    for count in counts:
+        sub = comm.Split(0 if rank < count else MPI.UNDEFINED, rank)
+        if sub != MPI.COMM_NULL:
+            rows = config["global_rows"] * (count if kind == "weak" else 1)
+            stats = run(sub, **dict(config, global_rows=rows))
+            sub.Free()
+            if rank == 0:
+                results.append(stats)
+        comm.Barrier()
+    return results
+
+
+def print_sweep(kind, results):
+    """
+    Print a scaling sweep as a table with speedup and parallel efficiency.
+    """
+    base = results[0]["seconds"]
+    print(f"\n{kind.capitalize()} scaling")
+    print(f"{'procs':>6} {'grid':>15} {'seconds':>12} {'updates/s':>12} {'speedup':>9} {'efficiency':>11}")
+    for stats in results:
+        speedup = base / stats["seconds"] if stats["seconds"] > 0 else 0.0
+        if kind == "strong":
+            efficiency = speedup / stats["processes"]
+        else:
+            efficiency = speedup
+            speedup *= stats["processes"]
+        grid = f"{stats['rows']}x{stats['cols']}"
+        print(f"{stats['processes']:>6} {grid:>15} {stats['seconds']:>12.6f} "
+              f"{stats['cell_updates_per_second']:>12.3e} {speedup:>9.2f} {efficiency:>11.2%}")
+
+
+def parse_dims(text):
+    """
+    Parse a process grid given as ROWSxCOLS; 0 lets MPI choose.
+    """
+    try:
+        rows, cols = (int(part) for part in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected ROWSxCOLS, got {text!r}")
+    return rows, cols
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Distributed Conway's Game of Life with tree-barrier synchronization.")
+    parser.add_argument("--rows", type=int, default=20, help="global grid rows")
+    parser.add_argument("--cols", type=int, default=20, help="global grid columns")
+    parser.add_argument("--generations", type=int, default=None,
+                        help="number of generations to run (default: until Enter is pressed)")
+    parser.add_argument("--time-step", type=float, default=None,
+                        help="seconds to pause after each printed frame (asked for when interactive)")
+    parser.add_argument("--pattern", default="plus",
+                        help="initial board: plus, random, or an RLE (.rle) or plaintext (.cells) file")
+    parser.add_argument("--density", type=float, default=0.25, help="live cell density of the random pattern")
+    parser.add_argument("--seed", type=int, default=None, help="seed of the random pattern")
+    parser.add_argument("--dims", type=parse_dims, default=(0, 0),
+                        help="process grid as ROWSxCOLS, 0 lets MPI choose (default 0x0)")
+    parser.add_argument("--engine", choices=("stencil", "hashlife"), default="stencil",
+                        help="update engine; hashlife runs on rank 0 only")
+    parser.add_argument("--packed", action="store_true", help="store 64 cells per word")
+    parser.add_argument("--overlap", action="store_true", help="overlap the halo exchange with compute")
+    parser.add_argument("--barrier", action=argparse.BooleanOptionalAction, default=None,
+                        help="barrier before every update (default: only without --overlap)")
+    parser.add_argument("--barrier-algorithm", default="tree",
+                        help="MPI barrier from the barriers registry: tree, dissemination or native")
+    parser.add_argument("--active", action="store_true", help="only recompute tiles near changes")
+    parser.add_argument("--tile-size", type=int, default=64, help="tile size for --active")
+    parser.add_argument("--halo-depth", type=int, default=1,
+                        help="halo rows/columns per side; halos are exchanged every that many generations")
+    parser.add_argument("--output", choices=("frames", "delta"), default="frames",
+                        help="ship whole frames or only changed cells to rank 0")
+    parser.add_argument("--output-every", type=int, default=1,
+                        help="print every N generations, 0 for only the final board "
+                             "(and boards asked for with o)")
+    parser.add_argument("--frames", default="-",
+                        help="where frames go: - for the terminal, *.npz or *.png files "
+                             "({generation} is substituted), an *.rle frame log, or a "
+                             "*.delta log of changed cells (needs --output delta)")
+    parser.add_argument("--frame-queue", type=int, default=4,
+                        help="frames that may wait for the writer before new ones are dropped")
+    parser.add_argument("--control-every", type=int, default=8,
+                        help="generations between polls of the stop/pause/checkpoint/output channel")
+    parser.add_argument("--cycle-check", type=int, default=0,
+                        help="look for a repeating board every N generations (0: never)")
+    parser.add_argument("--cycle-history", type=int, default=64,
+                        help="generations of board hashes kept, the longest period found")
+    parser.add_argument("--on-cycle", choices=("stop", "skip"), default="stop",
+                        help="stop once the board repeats, or skip ahead by whole periods")
+    parser.add_argument("--rebalance-every", type=int, default=0,
+                        help="move rows between ranks by measured compute time every N generations (0: never)")
+    parser.add_argument("--checkpoint", default=None, help="checkpoint file ({generation} is substituted)")
+    parser.add_argument("--checkpoint-every", type=int, default=0, help="checkpoint every N generations")
+    parser.add_argument("--restart", default=None, help="resume from a checkpoint file")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="no printing or sleeping; report throughput and per-phase times")
+    parser.add_argument("--sweep", choices=("strong", "weak"), default=None,
+                        help="benchmark on 1, 2, 4, ... processes (implies --benchmark)")
+    parser.add_argument("--verify", action="store_true",
+                        help="check the final board against the depth-1 stencil path")
+    args = parser.parse_args(argv)
+    if (args.benchmark or args.sweep or args.verify) and args.generations is None:
+        parser.error("--benchmark, --sweep and --verify need --generations")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    comm = MPI.COMM_WORLD
+    rank = comm.Get_rank()
+    benchmark = args.benchmark or args.sweep is not None
+
+    # Get the time step from user input (on rank 0 only) when running
+    # interactively without --time-step
+    time_step = args.time_step
+    if time_step is None and not benchmark and args.generations is None:
+        if rank == 0:
+            try:
+                time_step = float(input("Enter the time step (in seconds) between updates: "))
+            except ValueError:
+                print("Invalid input. Defaulting to 0.5 seconds.")
+                time_step = 0.5
+
+        # Broadcast the time step to all processes
+        time_step = comm.bcast(time_step, root=0)
+
+    config = dict(global_rows=args.rows, global_cols=args.cols, generations=args.generations,
+                  time_step=time_step or 0.0, show=not benchmark, pattern=args.pattern,
+                  density=args.density, seed=args.seed, output_every=args.output_every,
+                  frames=args.frames, frame_queue=args.frame_queue)
+    if args.engine == "hashlife":
+        run = run_hashlife
+    else:
+        run = run_game
+        config.update(packed=args.packed, overlap=args.overlap, barrier=args.barrier,
+                      barrier_algorithm=args.barrier_algorithm,
+                      dims=args.dims, active=args.active, tile_size=args.tile_size,
+                      halo_depth=args.halo_depth,
+                      output=args.output, checkpoint=args.checkpoint,
+                      checkpoint_every=args.checkpoint_every, restart=args.restart,
+                      control_every=args.control_every, cycle_check=args.cycle_check,
+                      cycle_history=args.cycle_history, on_cycle=args.on_cycle,
+                      rebalance_every=args.rebalance_every)
+
+    if args.verify:
+        stats, matches = verify_run(comm, run, **config)
+        if rank == 0:
+            print_report(stats)
+        if not matches:
+            sys.exit(1)
+    elif args.sweep:
+        results = scaling_sweep(comm, args.sweep, run, **config)
+        if rank == 0:
+            for stats in results:
+                print_report(stats)
+            print_sweep(args.sweep, results)
+    else:
+        stats = run(comm, **config)
+        if rank == 0 and (benchmark or args.generations is not None):
+            print_report(stats)
+
 
 if __name__ == "__main__":
     main()
@@ -2,6 +2,13 @@ from mpi4py import MPI
 import numpy as np
 import time
 import threading
+import os
+import sys
+
+# The barrier algorithms live in the barriers package at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from barriers.mpi import tree_barrier
 
 print_lock = threading.Lock()
 
@@ -9,27 +16,6 @@ def safe_print(message):
     with print_lock:
         print(message, end='', flush=True)
 
-def tree_barrier(rank, numprocs, comm):
-    mask = 1
-    while mask < numprocs:
-        target = rank ^ mask
-        if target < numprocs:
-            if rank > target:
-                comm.send(True, dest=target, tag=mask)
-            else:
-                comm.recv(source=target, tag=mask)
-        mask <<= 1
-
-    mask = numprocs >> 1
-    while mask > 0:
-        target = rank ^ mask
-        if target < numprocs:
-            if rank < target:
-                comm.send(True, dest=target, tag=mask)
-            else:
-                comm.recv(source=target, tag=mask)
-        mask >>= 1
-
 def work_simulation(rank):
     processing_time = np.random.uniform(0.1, 1.0) * (rank + 1)
     time.sleep(processing_time)
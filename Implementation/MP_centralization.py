@@ -1,5 +1,12 @@
 import threading
 import time
+import os
+import sys
+
+# The barrier algorithms live in the barriers package at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from barriers.threads import CentralizedBarrier
 
 NUM_THREADS = 8
 NUM_BARRIERS = 5
@@ -7,39 +14,6 @@ NUM_BARRIERS = 5
 # Tạo một A dùng chung để in output
 print_lock = threading.Lock()
 
-class CentralizedBarrier:
-    def __init__(self, num_threads):
-        self.num_threads = num_threads
-        self.count = num_threads
-        self.sense = False
-        self.local_sense = threading.local()
-        self.lock = threading.Lock()
-        self.barrier_condition = threading.Condition(self.lock)
-
-    def wait(self):
-        with self.lock:
-            # Toggle local sense for this thread
-            current_sense = not self.sense
-
-            # Store local sense 
-            self.local_sense.value = current_sense
-
-            # Decrement the count of threads waiting
-            self.count -= 1
-
-            # If this is the last thread
-            if self.count == 0:
-                # Reset the count
-                self.count = self.num_threads
-                # Flip the global sense
-                self.sense = current_sense
-                # Wake up all waiting threads
-                self.barrier_condition.notify_all()
-            else:
-                # Wait until the sense changes
-                while self.sense != current_sense:
-                    self.barrier_condition.wait()
-
 def worker(thread_num, num_threads, barrier):
     for j in range(NUM_BARRIERS):
         time.sleep(0.0001)
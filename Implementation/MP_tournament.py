@@ -1,20 +1,19 @@
 import threading
-import math
 import time
+import os
+import sys
 
-NUM_THREADS = 0
-NUM_BARRIERS = 0
-array = [[None for _ in range(100)] for _ in range(1000)]
+# The barrier algorithms live in the barriers package at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from barriers.threads import TournamentBarrier
+
+NUM_THREADS = 8
+NUM_BARRIERS = 5
 
 # Create a lock to synchronize printing
 print_lock = threading.Lock()
 
-class Round:
-    def __init__(self):
-        self.role = -1
-        self.opponent = None
-        self.flag = False
-
 def safe_print(message):
     """
     Safely print messages with lock
@@ -22,47 +21,14 @@ def safe_print(message):
     with print_lock:
         print(message)
 
-def barrier(vpid, sense, rounds):
-    round = 0
-
-    while True:
-        if array[vpid][round].role == "loser":
-            array[vpid][round].opponent.flag = sense[0]
-            while array[vpid][round].flag != sense[0]:
-                pass
-            break
-
-        if array[vpid][round].role == "winner":
-            while array[vpid][round].flag != sense[0]:
-                pass
-
-        if array[vpid][round].role == "champion":
-            while array[vpid][round].flag != sense[0]:
-                pass
-            array[vpid][round].opponent.flag = sense[0]
-            break
-
-        if round < rounds:
-            round += 1
-
-    # Wake up
-    while round > 0:
-        round -= 1
-        if array[vpid][round].role == "winner":
-            array[vpid][round].opponent.flag = sense[0]
-        if array[vpid][round].role == "dropout":
-            break
-
-    sense[0] = not sense[0]
-
-def thread_function(vpid, rounds, sense):
+def thread_function(vpid, barrier):
     for i in range(NUM_BARRIERS):
         for _ in range(50):
             pass
 
         safe_print(f"[Thread {vpid:2d}] Starting iteration {i+1}")
         start_time = time.time()
-        barrier(vpid, sense, rounds)
+        barrier.wait(vpid)
         end_time = time.time()
         
         safe_print(f"[Thread {vpid:2d}] Barrier completed")
@@ -71,45 +37,17 @@ def thread_function(vpid, rounds, sense):
 
 def main():
     global NUM_THREADS, NUM_BARRIERS
-    NUM_BARRIERS = 5
-    NUM_THREADS = 8 
-    rounds = math.ceil(math.log(NUM_THREADS, 2))
-
-    # Initialize array
-    for j in range(NUM_THREADS):
-        for k in range(rounds + 1):
-            array[j][k] = Round()
-
-    for l in range(NUM_THREADS):
-        for k in range(rounds + 1):
-            comp = math.ceil(2 ** k)
-            comp_second = math.ceil(2 ** (k - 1))
-
-            if k > 0 and l % comp == 0 and (l + comp_second) < NUM_THREADS and comp < NUM_THREADS:
-                array[l][k].role = "winner"
-
-            if k > 0 and l % comp == 0 and (l + comp_second) >= NUM_THREADS:
-                array[l][k].role = "bye"
-
-            if k > 0 and (l % comp == comp_second):
-                array[l][k].role = "loser"
-
-            if k > 0 and l == 0 and comp >= NUM_THREADS:
-                array[l][k].role = "champion"
-
-            if k == 0:
-                array[l][k].role = "dropout"
-           # Logic bắt cặp : "loser" sẽ bắt cặp với node phía trước nó cách 2^(k-1), và ngược lại
-            if array[l][k].role == "loser":
-                array[l][k].opponent = array[l - comp_second][k]
+    if len(sys.argv) > 1:
+        NUM_THREADS = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        NUM_BARRIERS = int(sys.argv[2])
 
-            if array[l][k].role in ["winner", "champion"]:
-                array[l][k].opponent = array[l + comp_second][k]
+    # The barrier owns its state, sized for exactly NUM_THREADS threads
+    barrier = TournamentBarrier(NUM_THREADS)
 
     threads = []
     for vpid in range(NUM_THREADS):
-        sense = [True]
-        thread = threading.Thread(target=thread_function, args=(vpid, rounds, sense))
+        thread = threading.Thread(target=thread_function, args=(vpid, barrier))
         threads.append(thread)
         thread.start()
 
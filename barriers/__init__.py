@@ -0,0 +1,13 @@
+"""
+Barrier algorithms for threads, processes and MPI ranks behind one
+interface (Barrier.wait/arrive/depart), selected by name:
+
+    barrier = barriers.create("dissemination", "thread", 8)
+    barrier.wait()
+"""
+from .arena import CACHE_LINE, FlagArena
+from .base import Barrier, ThreadIds, ProcessIds
+from .policy import AdaptiveWait
+from .registry import BACKENDS, register, get, create, available
+
+__all__ = ["Barrier", "ThreadIds", "ProcessIds", "AdaptiveWait", "CACHE_LINE", "FlagArena", "BACKENDS", "register", "get", "create", "available"]
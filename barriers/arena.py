@@ -0,0 +1,67 @@
+import ctypes
+import os
+from multiprocessing.shared_memory import SharedMemory
+
+# Bytes per flag: one cache line on current x86 and most ARM cores
+CACHE_LINE = 64
+
+
+class FlagArena:
+    """
+    Integer flags shared between processes, all in one
+    multiprocessing.shared_memory mapping with every flag on its own
+    `line`-byte slot, so processes writing different flags never write the
+    same cache line. The mapping is page aligned, so slots are line
+    aligned. line=4 packs the flags into adjacent ints instead, which is
+    only useful to measure what the padding saves.
+
+    Processes started by fork inherit the mapping; those started by spawn
+    or forkserver map it again when the arena is unpickled. close() unmaps
+    it and, in the creating process, removes the segment.
+    """
+
+    def __init__(self, count, line=CACHE_LINE):
+        size = ctypes.sizeof(ctypes.c_int)
+        if line < size or line % size:
+            raise ValueError(f"Flag slots must be a multiple of {size} bytes, not {line}")
+        self.count = count
+        self.line = line
+        self.stride = line // size
+        # Zeroed by the kernel
+        self.shm = SharedMemory(create=True, size=max(1, count) * line)
+        self.owner = os.getpid()
+        self.view = self.shm.buf.cast("i")
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        return self.view[index * self.stride]
+
+    def __setitem__(self, index, value):
+        self.view[index * self.stride] = value
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["view"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.view = self.shm.buf.cast("i")
+
+    def close(self):
+        if self.view is None:
+            return
+        self.view.release()
+        self.view = None
+        self.shm.close()
+        if os.getpid() == self.owner:
+            self.shm.unlink()
+
+    def __del__(self):
+        # The mapping cannot be closed while the view exists, so drop the
+        # view first in copies that never call close
+        view = getattr(self, "view", None)
+        if view is not None:
+            view.release()
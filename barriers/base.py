@@ -0,0 +1,88 @@
+import threading
+import ctypes
+from multiprocessing import Value
+
+
+class Barrier:
+    """
+    Common interface of every barrier in this package.
+
+    wait(pid) blocks until all parties have called it. arrive(pid) and
+    depart(pid) split it in two, so a participant can do unrelated work
+    after announcing its arrival: depart returns once every party has
+    arrived. The default arrive does nothing and depart runs the whole
+    barrier, which is always correct; barriers built on a shared counter
+    override both to announce the arrival early.
+
+    pid is the participant's index in 0..parties-1. Barriers that need it
+    assign one on first use when it is omitted (see ThreadIds and
+    ProcessIds).
+
+    close() releases whatever the barrier allocated outside the Python
+    heap, such as shared memory segments. Call it from the creating
+    process once every participant has finished.
+    """
+
+    parties = 0
+
+    def wait(self, pid=None):
+        raise NotImplementedError
+
+    def arrive(self, pid=None):
+        pass
+
+    def depart(self, pid=None):
+        self.wait(pid)
+
+    def close(self):
+        pass
+
+
+class ThreadIds:
+    """
+    Participant ids for threads: the first call from each thread takes the
+    next free id, remembered in a threading.local.
+    """
+
+    def __init__(self, parties):
+        self.parties = parties
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.next = 0
+
+    def get(self, pid=None):
+        if pid is not None:
+            return pid
+        pid = getattr(self.local, "pid", None)
+        if pid is None:
+            with self.lock:
+                pid = self.next
+                self.next += 1
+            if pid >= self.parties:
+                raise RuntimeError(f"More than {self.parties} threads use this barrier")
+            self.local.pid = pid
+        return pid
+
+
+class ProcessIds:
+    """
+    Participant ids for processes: the first call in each process takes the
+    next free id from a shared counter. Every process works on its own copy
+    of the barrier object, which remembers the id.
+    """
+
+    def __init__(self, parties):
+        self.parties = parties
+        self.next = Value(ctypes.c_int, 0, lock=True)
+        self.pid = None
+
+    def get(self, pid=None):
+        if pid is not None:
+            return pid
+        if self.pid is None:
+            with self.next.get_lock():
+                self.pid = self.next.value
+                self.next.value += 1
+            if self.pid >= self.parties:
+                raise RuntimeError(f"More than {self.parties} processes use this barrier")
+        return self.pid
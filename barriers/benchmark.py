@@ -0,0 +1,233 @@
+"""
+Time barrier episodes for any registered algorithm:
+
+    python -m barriers.benchmark --backend thread --parties 8
+    python -m barriers.benchmark --backend process --barrier centralized --parties 4
+    python -m barriers.benchmark --barrier combining-tree --parties 16 --fanin 2,4,8
+    python -m barriers.benchmark --backend process --barrier mcs --line 4,64
+    python -m barriers.benchmark --false-sharing --parties 4
+    mpiexec -n 8 python -m barriers.benchmark --backend mpi
+    mpiexec -n 5 python -m barriers.benchmark --backend mpi --check
+"""
+import argparse
+import inspect
+import itertools
+import multiprocessing as mp
+import random
+import threading
+import time
+from array import array
+from multiprocessing import RawArray
+
+from .arena import FlagArena
+from .registry import available, create, get
+
+# Constructor options the command line can sweep, with their column labels
+SWEEPS = {"fanin": "k", "line": "line"}
+
+# Longest random delay (seconds) before each arrival when checking MPI
+# barriers, so that the ranks reach them in a different order every episode
+CHECK_DELAY = 100e-6
+
+
+def _episodes(barrier, pid, episodes, arrived, failures):
+    """
+    Run the episodes of one participant. With arrived set, check after
+    every episode that nobody is still behind it.
+    """
+    for episode in range(1, episodes + 1):
+        if arrived is not None:
+            arrived[pid] = episode
+        barrier.wait(pid)
+        if arrived is not None and min(arrived) < episode:
+            failures[pid] += 1
+
+
+def _process_worker(barrier, pid, episodes, arrived, failures, times):
+    start = time.perf_counter()
+    _episodes(barrier, pid, episodes, arrived, failures)
+    times[pid] = time.perf_counter() - start
+
+
+def run_threads(name, parties, episodes=1000, check=False, **options):
+    """
+    Seconds per episode (slowest thread) of the named thread barrier, and
+    the number of early departures seen when check is set.
+    """
+    barrier = create(name, "thread", parties, **options)
+    arrived = [0] * parties if check else None
+    failures = [0] * parties
+    times = [0.0] * parties
+
+    def worker(pid):
+        start = time.perf_counter()
+        _episodes(barrier, pid, episodes, arrived, failures)
+        times[pid] = time.perf_counter() - start
+
+    threads = [threading.Thread(target=worker, args=(pid,)) for pid in range(parties)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return max(times) / episodes, sum(failures)
+
+
+def run_processes(name, parties, episodes=1000, check=False, **options):
+    """
+    Seconds per episode (slowest process) of the named process barrier, and
+    the number of early departures seen when check is set.
+    """
+    barrier = create(name, "process", parties, **options)
+    arrived = RawArray("i", parties) if check else None
+    failures = RawArray("i", parties)
+    times = RawArray("d", parties)
+    processes = [mp.Process(target=_process_worker, args=(barrier, pid, episodes, arrived, failures, times))
+                 for pid in range(parties)]
+    try:
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+    finally:
+        barrier.close()
+    if any(process.exitcode != 0 for process in processes):
+        raise RuntimeError(f"A process running the {name} barrier failed")
+    return max(times) / episodes, sum(failures)
+
+
+def run_mpi(name, comm, episodes=1000, check=False, **options):
+    """
+    Seconds per episode (slowest rank) of the named MPI barrier on comm, and
+    the number of early departures seen when check is set.
+
+    The check keeps every rank's episode number in an RMA window on rank 0:
+    each rank waits a random delay, stores its number there and enters the
+    barrier, then reads all the numbers back. The window is updated with
+    atomic accumulates, so it works across nodes as well.
+    """
+    from mpi4py import MPI
+
+    barrier = create(name, "mpi", comm, **options)
+    rank, size = comm.Get_rank(), comm.Get_size()
+    failures = 0
+    window = None
+    if check:
+        # NO_OP ignores the origin buffer but takes its length from it
+        mine, arrived, unused = array("i", [0]), array("i", [0] * size), array("i", [0] * size)
+        window = MPI.Win.Allocate(mine.itemsize * size if rank == 0 else 0, mine.itemsize, comm=comm)
+        window.Lock_all()
+        window.Accumulate(mine, 0, target=rank, op=MPI.REPLACE)
+        window.Flush(0)
+        delays = random.Random(rank)
+    comm.Barrier()
+    start = time.perf_counter()
+    for episode in range(1, episodes + 1):
+        if window is not None:
+            time.sleep(delays.random() * CHECK_DELAY)
+            mine[0] = episode
+            window.Accumulate(mine, 0, target=rank, op=MPI.REPLACE)
+            window.Flush(0)
+        barrier.wait()
+        if window is not None:
+            window.Get_accumulate(unused, arrived, 0, op=MPI.NO_OP)
+            window.Flush(0)
+            if min(arrived) < episode:
+                failures += 1
+    elapsed = time.perf_counter() - start
+    if window is not None:
+        window.Unlock_all()
+        window.Free()
+    return max(comm.allgather(elapsed)) / episodes, comm.allreduce(failures)
+
+
+def _false_sharing_worker(arena, index, writes, times):
+    view, slot = arena.view, index * arena.stride
+    start = time.perf_counter()
+    for _ in range(writes):
+        view[slot] += 1
+    times[index] = time.perf_counter() - start
+
+
+def run_false_sharing(parties, line, writes=1000000):
+    """
+    Seconds per write (slowest process) when every process repeatedly
+    increments its own flag of a FlagArena with line-byte slots: line=4
+    packs the flags onto shared cache lines, 64 gives each its own.
+    """
+    arena = FlagArena(parties, line)
+    times = RawArray("d", parties)
+    processes = [mp.Process(target=_false_sharing_worker, args=(arena, index, writes, times))
+                 for index in range(parties)]
+    try:
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        if any(arena[index] != writes for index in range(parties)):
+            raise RuntimeError("A false sharing worker failed")
+    finally:
+        arena.close()
+    return max(times) / writes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time barrier episodes.")
+    parser.add_argument("--backend", choices=("thread", "process", "mpi"), default="thread")
+    parser.add_argument("--barrier", default="all", help="registered barrier name, or all")
+    parser.add_argument("--parties", type=int, default=4, help="threads or processes (mpi: the ranks)")
+    parser.add_argument("--episodes", type=int, default=1000, help="barrier episodes to time")
+    parser.add_argument("--check", action="store_true", help="count participants that leave early")
+    parser.add_argument("--fanin", default=None,
+                        help="comma-separated fan-ins to try with the combining-tree barrier")
+    parser.add_argument("--line", default=None,
+                        help="comma-separated bytes per shared flag to try with the process barriers "
+                             "(4 packs them, 64 pads each to a cache line)")
+    parser.add_argument("--false-sharing", action="store_true",
+                        help="instead of barriers, time processes writing their own flags "
+                             "packed and padded (--line, default 4,64)")
+    args = parser.parse_args(argv)
+
+    if args.false_sharing:
+        writes = args.episodes * 100
+        print(f"{'line':>6} {'processes':>9} {'ns/write':>10}")
+        for line in [int(b) for b in (args.line or "4,64").split(",")]:
+            seconds = run_false_sharing(args.parties, line, writes)
+            print(f"{line:>6} {args.parties:>9} {seconds * 1e9:>10.1f}")
+        return
+
+    names = available(args.backend) if args.barrier == "all" else [args.barrier]
+    sweeps = {option: [int(value) for value in getattr(args, option).split(",")]
+              for option in SWEEPS if getattr(args, option)}
+    runs = []
+    for name in names:
+        # Sweep only the options this barrier's constructor takes
+        accepted = inspect.signature(get(name, args.backend)).parameters
+        swept = [option for option in sweeps if option in accepted]
+        for values in itertools.product(*(sweeps[option] for option in swept)):
+            options = dict(zip(swept, values))
+            label = " ".join([name] + [f"{SWEEPS[option]}={value}" for option, value in options.items()])
+            runs.append((label, name, options))
+    show = True
+    if args.backend == "mpi":
+        from mpi4py import MPI
+        comm = MPI.COMM_WORLD
+        parties = comm.Get_size()
+        show = comm.Get_rank() == 0
+    else:
+        parties = args.parties
+
+    if show:
+        print(f"{'barrier':<28} {'backend':<8} {'parties':>7} {'us/episode':>12} {'early':>6}")
+    for label, name, options in runs:
+        if args.backend == "thread":
+            seconds, failures = run_threads(name, parties, args.episodes, args.check, **options)
+        elif args.backend == "process":
+            seconds, failures = run_processes(name, parties, args.episodes, args.check, **options)
+        else:
+            seconds, failures = run_mpi(name, comm, args.episodes, args.check, **options)
+        if show:
+            print(f"{label:<28} {args.backend:<8} {parties:>7} {seconds * 1e6:>12.2f} {failures:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+from array import array
+
+from .base import Barrier
+
+
+class CombiningTreeBarrier(Barrier):
+    """
+    Software combining-tree barrier with fan-in k for any number of
+    parties.
+
+    Participants are grouped k to a leaf counter, leaves k to a counter one
+    level up, and so on up to a single root. An arrival decrements its
+    node's counter under that node's lock; the last arriver resets the
+    counter and moves up to the parent, the others wait on the node's sense
+    flag. The last arriver at the root then flips the sense of every node
+    on its way back down, releasing each node's waiters, so only k parties
+    ever contend for one lock.
+
+    Subclasses provide the flag array (2 entries per node: counters, then
+    senses), one lock per node in self.locks, and _await, which returns
+    once flags[index] == value.
+    """
+
+    def _init_tree(self, parties, fanin):
+        if fanin < 2:
+            raise ValueError(f"Combining tree fan-in must be at least 2, not {fanin}")
+        self.parties = parties
+        self.fanin = fanin
+        self.sense = array("b", [1] * parties)
+
+        # Nodes level by level, leaves first: fans[node] is the number of
+        # arrivals the node waits for, parents[node] its parent (-1: root)
+        fans, parents = [], []
+        width, first = parties, 0
+        while True:
+            nodes = -(-width // fanin)
+            fans += [min(fanin, width - i * fanin) for i in range(nodes)]
+            if nodes == 1:
+                parents.append(-1)
+                break
+            parents += [first + nodes + i // fanin for i in range(nodes)]
+            width, first = nodes, first + nodes
+        self.nodes = len(fans)
+        self.fans = array("i", fans)
+        self.parents = array("i", parents)
+
+    def _init_counters(self):
+        for node in range(self.nodes):
+            self.flags[node] = self.fans[node]
+
+    def _await(self, index, value):
+        raise NotImplementedError
+
+    def wait(self, pid=None):
+        pid = self.ids.get(pid)
+        flags, fans, parents, locks = self.flags, self.fans, self.parents, self.locks
+        sense = self.sense[pid]
+
+        # Arrival: climb while this participant is the last at its node
+        completed = []
+        node = pid // self.fanin
+        while True:
+            with locks[node]:
+                flags[node] -= 1
+                last = flags[node] == 0
+                if last:
+                    flags[node] = fans[node]
+            if not last:
+                self._await(self.nodes + node, sense)
+                break
+            completed.append(node)
+            node = parents[node]
+            if node < 0:
+                break
+
+        # Release the nodes this participant completed, top down
+        for node in reversed(completed):
+            flags[self.nodes + node] = sense
+        self.sense[pid] = 1 - sense
@@ -0,0 +1,57 @@
+from array import array
+
+from .base import Barrier
+
+# Children per node in the arrival and in the wakeup tree
+ARRIVAL_FANIN = 4
+WAKEUP_FANOUT = 2
+
+
+class MCSBarrier(Barrier):
+    """
+    MCS tree barrier (Mellor-Crummey and Scott) for any number of parties.
+
+    Participants arrive up a 4-ary tree: node i waits for its children
+    4i+1..4i+4, then clears its own child-not-ready flag in its parent's
+    block of four, entry i - 1 of the flag array. They are released down a
+    binary tree: node i waits for its parent-sense flag, entry 4P + i,
+    which parent (i - 1) // 2 sets. Every flag has exactly one waiter, so
+    nobody polls a location that all parties write.
+
+    Subclasses provide the flag array (5P entries) and _await, which
+    returns once flags[index] == value.
+    """
+
+    def _init_tree(self, parties):
+        self.parties = parties
+        self.wakeup = ARRIVAL_FANIN * parties
+        self.sense = array("b", [1] * parties)
+        # Child-not-ready is set for every child that exists: child i + 1
+        # reports in entry i
+        for index in range(parties - 1):
+            self.flags[index] = 1
+
+    def _await(self, index, value):
+        raise NotImplementedError
+
+    def wait(self, pid=None):
+        pid = self.ids.get(pid)
+        flags, parties = self.flags, self.parties
+        sense = self.sense[pid]
+
+        # Arrival: wait for the children, re-arm their flags for the next
+        # episode (they cannot arrive again before the wakeup) and report
+        # to the parent
+        first = ARRIVAL_FANIN * pid
+        for index in range(first, min(first + ARRIVAL_FANIN, parties - 1)):
+            self._await(index, 0)
+            flags[index] = 1
+        if pid:
+            flags[pid - 1] = 0
+            self._await(self.wakeup + pid, sense)
+
+        # Wakeup: release the children in the binary tree
+        first = WAKEUP_FANOUT * pid + 1
+        for child in range(first, min(first + WAKEUP_FANOUT, parties)):
+            flags[self.wakeup + child] = sense
+        self.sense[pid] = 1 - sense
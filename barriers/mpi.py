@@ -0,0 +1,78 @@
+from .base import Barrier
+from .registry import register
+
+
+def tree_barrier(rank, numprocs, comm):
+    """
+    Implements a tree-based barrier synchronization over a binomial tree,
+    for any number of ranks: the parent of rank r is r minus its lowest set
+    bit, and its children are r + 1, r + 2, r + 4, ... below that bit.
+    """
+    # Phase 1: Gather (Bottom-up): wait for the children, then report to
+    # the parent
+    mask = 1
+    while mask < numprocs:
+        if rank & mask:
+            comm.send(True, dest=rank - mask, tag=mask)
+            break
+        if rank + mask < numprocs:
+            comm.recv(source=rank + mask, tag=mask)
+        mask <<= 1
+
+    # Phase 2: Release (Top-down): wait for the parent (rank 0 has none),
+    # then release the children, farthest first
+    if rank:
+        comm.recv(source=rank - mask, tag=mask)
+    mask >>= 1
+    while mask > 0:
+        if rank + mask < numprocs:
+            comm.send(True, dest=rank + mask, tag=mask)
+        mask >>= 1
+
+
+class MPIBarrier(Barrier):
+    """
+    Base of the MPI barriers: every rank of comm is a party and its rank is
+    its pid.
+    """
+
+    def __init__(self, comm):
+        self.comm = comm
+        self.rank = comm.Get_rank()
+        self.parties = comm.Get_size()
+
+
+@register("tree", "mpi")
+class TreeBarrier(MPIBarrier):
+    """
+    Binomial-tree barrier: ranks combine up the tree and are released back
+    down it (see tree_barrier).
+    """
+
+    def wait(self, pid=None):
+        tree_barrier(self.rank, self.parties, self.comm)
+
+
+@register("dissemination", "mpi")
+class DisseminationBarrier(MPIBarrier):
+    """
+    Dissemination barrier: in round r every rank sends to rank + 2^r and
+    receives from rank - 2^r (mod P), ceil(log2 P) rounds in all.
+    """
+
+    def wait(self, pid=None):
+        distance = 1
+        while distance < self.parties:
+            self.comm.sendrecv(None, dest=(self.rank + distance) % self.parties, sendtag=distance,
+                               source=(self.rank - distance) % self.parties, recvtag=distance)
+            distance <<= 1
+
+
+@register("native", "mpi")
+class NativeBarrier(MPIBarrier):
+    """
+    The MPI library's own MPI_Barrier.
+    """
+
+    def wait(self, pid=None):
+        self.comm.Barrier()
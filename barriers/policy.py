@@ -0,0 +1,94 @@
+import time
+
+
+class AdaptiveWait:
+    """
+    Spin, then yield, then block. A waiter polls its condition for up to
+    the spin budget, then gives the CPU away `yields` times with sleep(0),
+    and only then falls back to the barrier's blocking wait.
+
+    With adapt set the policy tunes itself from the recent waits. While
+    their moving average stays under max_spin the spin budget is twice
+    that average, so short waits finish without a context switch; once
+    waits grow longer the waiter spins only min_spin and does not yield,
+    so long waits do not burn a core. A phase that rarely ends the wait
+    (spinning under the GIL, which keeps the other threads from arriving,
+    or any spinning on an oversubscribed machine) is skipped as well.
+    Probe waits try all phases again so the policy notices when they start
+    paying off: every probe-th wait at first, twice as far apart after
+    every probe that did not pay off, up to max_probe.
+    """
+
+    def __init__(self, spin=10e-6, yields=10, max_spin=50e-6, min_spin=0.0, adapt=True,
+                 weight=0.25, probe=32, max_probe=4096, min_hits=0.5):
+        self.spin = spin
+        self.yields = yields
+        self.max_spin = max_spin
+        self.min_spin = min_spin
+        self.adapt = adapt
+        self.weight = weight
+        self.probe = probe
+        self.max_probe = max_probe
+        self.min_hits = min_hits
+        # Moving averages of the recent waits (seconds) and of how often
+        # the spin and yield phases ended them
+        self.recent = spin
+        self.spin_hits = 1.0
+        self.yield_hits = 1.0
+        self.waits = 0
+        self.interval = probe
+        self.next_probe = 0
+
+    def wait(self, done, block):
+        """
+        Return once done() is true; block(done) is the blocking fallback and
+        must itself return only once done() is true.
+        """
+        if done():
+            return
+        start = time.perf_counter()
+        probe = self.adapt and self.waits >= self.next_probe
+        self.waits += 1
+        short = not self.adapt or probe or self.recent < self.max_spin
+        spin = self.spin if short and (probe or self.spin_hits >= self.min_hits) else self.min_spin
+        yields = self.yields if short and (probe or self.yield_hits >= self.min_hits) else 0
+        if spin > 0 and self._spin(done, start + spin):
+            phase = "spin"
+        elif yields > 0 and self._yield(done, yields):
+            phase = "yield"
+        else:
+            block(done)
+            phase = "block"
+        if self.adapt:
+            self._record(time.perf_counter() - start, spin, yields, phase, probe)
+
+    def _spin(self, done, deadline):
+        while time.perf_counter() < deadline:
+            if done():
+                return True
+        return False
+
+    def _yield(self, done, yields):
+        for _ in range(yields):
+            time.sleep(0)
+            if done():
+                return True
+        return False
+
+    def _record(self, waited, spin, yields, phase, probe):
+        weight = self.weight
+        self.recent += weight * (waited - self.recent)
+        self.spin = max(self.min_spin, min(self.max_spin, 2 * self.recent))
+        # A phase only pays off if it ends a short wait: yielding through a
+        # long one just takes turns on the CPU with the threads still working
+        short = waited < self.max_spin
+        if spin > 0:
+            self.spin_hits += weight * ((phase == "spin" and short) - self.spin_hits)
+        if yields > 0 and phase != "spin":
+            self.yield_hits += weight * ((phase == "yield" and short) - self.yield_hits)
+        if probe:
+            if phase != "block" and short:
+                self.interval = self.probe
+            else:
+                self.interval = min(self.max_probe, 2 * self.interval)
+            self.next_probe = self.waits + self.interval
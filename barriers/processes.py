@@ -0,0 +1,208 @@
+import ctypes
+import math
+import os
+import time
+from multiprocessing import Lock, Value, reduction
+
+from .arena import CACHE_LINE, FlagArena
+from .base import Barrier, ProcessIds
+from .combining import CombiningTreeBarrier
+from .mcs import ARRIVAL_FANIN, MCSBarrier
+from .policy import AdaptiveWait
+from .registry import register
+
+# Sleep between polls of a waiting process, doubling up to MAX_BACKOFF
+BASE_BACKOFF = 0.000001
+MAX_BACKOFF = 0.001
+
+
+@register("centralized", "process")
+class OptimizedBarrier(Barrier):
+    """
+    Centralized process barrier: arrivals increment a shared counter, the
+    last one resets it and bumps a shared generation number, and the others
+    watch the generation under the waiting policy (AdaptiveWait by
+    default), finally polling it with exponential backoff. The generation
+    sits on its own cache line, so arrivals updating the counter do not
+    disturb the waiters polling it.
+    """
+
+    def __init__(self, num_threads, policy=None, line=CACHE_LINE):
+        self.num_threads = num_threads
+        self.parties = num_threads
+        self.policy = policy if policy is not None else AdaptiveWait()
+        self.count = Value(ctypes.c_int, 0, lock=True)  # Use lock=True for atomic operations
+        self.generation = FlagArena(1, line)
+
+    def wait(self, pid=None):
+        # Reading the generation needs no lock: only the last arriver
+        # writes it, under the counter's lock
+        generation = self.generation
+        gen = generation[0]
+
+        with self.count.get_lock():
+            self.count.value += 1
+            if self.count.value == self.num_threads:
+                self.count.value = 0
+                generation[0] = gen + 1
+                return
+
+        self.policy.wait(lambda: generation[0] != gen, self._block)
+
+    def _block(self, done):
+        # Exponential backoff while waiting
+        backoff = BASE_BACKOFF
+        while not done():
+            time.sleep(backoff)
+            backoff = min(backoff * 2, MAX_BACKOFF)
+
+    def close(self):
+        self.generation.close()
+
+
+class SharedFlagsBarrier(Barrier):
+    """
+    Base of the process barriers whose flags live in a FlagArena,
+    self.flags: one shared memory mapping with every flag on its own cache
+    line (line bytes per flag).
+    """
+
+    # Polls of a flag before backing off to sleeping
+    SPIN_POLLS = 100
+
+    def _create_flags(self, count, line=CACHE_LINE):
+        self.flags = FlagArena(count, line)
+
+    def _await(self, index, value):
+        """
+        Return once flags[index] == value: poll, then back off exponentially.
+        """
+        # Index the mapping directly: this is the loop the waiters spin in
+        view, slot = self.flags.view, index * self.flags.stride
+        polls = 0
+        backoff = BASE_BACKOFF
+        while view[slot] != value:
+            polls += 1
+            if polls > self.SPIN_POLLS:
+                time.sleep(backoff)
+                backoff = min(backoff * 2, MAX_BACKOFF)
+
+    def close(self):
+        self.flags.close()
+
+
+@register("dissemination", "process")
+class DisseminationBarrier(SharedFlagsBarrier):
+    """
+    Dissemination barrier over shared memory. In round r process pid sets a
+    flag of process (pid + 2^r) mod P and waits for its own flag, set by
+    process (pid - 2^r) mod P; after ceil(log2 P) rounds everybody has
+    arrived. Flags alternate between two parity sets and the sense flips
+    every other episode, so no flag is ever reset. Parity and sense are
+    private to each process's copy of the barrier.
+    """
+
+    def __init__(self, parties, line=CACHE_LINE):
+        self.parties = parties
+        self.rounds = math.ceil(math.log2(parties)) if parties > 1 else 0
+        self.ids = ProcessIds(parties)
+        # flags[(pid * 2 + parity) * rounds + r]
+        self._create_flags(2 * parties * self.rounds, line)
+        self.parity = 0
+        self.sense = 1
+
+    def wait(self, pid=None):
+        pid = self.ids.get(pid)
+        flags, parity, sense = self.flags, self.parity, self.sense
+        mine = (pid * 2 + parity) * self.rounds
+        for r in range(self.rounds):
+            partner = (pid + (1 << r)) % self.parties
+            flags[(partner * 2 + parity) * self.rounds + r] = sense
+            self._await(mine + r, sense)
+        if parity == 1:
+            self.sense = 1 - sense
+        self.parity = 1 - parity
+
+
+@register("mcs", "process")
+class MCSProcessBarrier(SharedFlagsBarrier, MCSBarrier):
+    """
+    MCS tree barrier (see barriers.mcs.MCSBarrier) with its flags in shared
+    memory.
+    """
+
+    def __init__(self, parties, line=CACHE_LINE):
+        self.ids = ProcessIds(parties)
+        self._create_flags((ARRIVAL_FANIN + 1) * parties, line)
+        self._init_tree(parties)
+
+
+@register("combining-tree", "process")
+class CombiningTreeProcessBarrier(SharedFlagsBarrier, CombiningTreeBarrier):
+    """
+    Combining-tree barrier (see barriers.combining.CombiningTreeBarrier)
+    with its counters and senses in shared memory.
+    """
+
+    def __init__(self, parties, fanin=4, line=CACHE_LINE):
+        self.ids = ProcessIds(parties)
+        self._init_tree(parties, fanin)
+        self.locks = [Lock() for _ in range(self.nodes)]
+        self._create_flags(2 * self.nodes, line)
+        self._init_counters()
+
+
+@register("eventfd", "process")
+class EventfdBarrier(Barrier):
+    """
+    Blocking process barrier on Linux eventfds. Arrivals count up under a
+    shared lock; everybody but the last blocks in read() on a semaphore
+    eventfd, and the last arriver releases them all with a single write()
+    of P - 1. Episodes alternate between two eventfds, so a process that
+    races ahead can never take a wakeup meant for the previous episode.
+    """
+
+    def __init__(self, parties):
+        if not hasattr(os, "eventfd"):
+            raise RuntimeError("The eventfd barrier needs Linux and Python 3.10 or later")
+        self.parties = parties
+        self.count = Value(ctypes.c_int, 0, lock=True)
+        self.fds = [os.eventfd(0, os.EFD_SEMAPHORE | os.EFD_CLOEXEC) for _ in range(2)]
+        self.owner = os.getpid()
+        self.parity = 0
+        self.last = False
+
+    def __getstate__(self):
+        # Processes started by spawn or forkserver receive duplicates of
+        # the eventfds along with the pickled barrier
+        state = self.__dict__.copy()
+        state["fds"] = [reduction.DupFd(fd) for fd in self.fds]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.fds = [fd.detach() for fd in self.fds]
+
+    def arrive(self, pid=None):
+        with self.count.get_lock():
+            self.count.value += 1
+            self.last = self.count.value == self.parties
+            if self.last:
+                self.count.value = 0
+        if self.last and self.parties > 1:
+            os.eventfd_write(self.fds[self.parity], self.parties - 1)
+
+    def depart(self, pid=None):
+        if not self.last:
+            os.eventfd_read(self.fds[self.parity])
+        self.parity = 1 - self.parity
+
+    def wait(self, pid=None):
+        self.arrive(pid)
+        self.depart(pid)
+
+    def close(self):
+        if os.getpid() == self.owner and self.fds:
+            for fd in self.fds:
+                os.close(fd)
+            self.fds = []
@@ -0,0 +1,59 @@
+import importlib
+
+# Module holding the barriers of each backend; imported on first use, so
+# mpi4py is only needed for the mpi backend
+BACKENDS = {
+    "thread": "barriers.threads",
+    "process": "barriers.processes",
+    "mpi": "barriers.mpi",
+}
+
+_registry = {}
+
+
+def register(name, backend):
+    """
+    Class decorator adding a barrier to the registry under (name, backend).
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown barrier backend: {backend}")
+
+    def decorator(cls):
+        _registry[(name, backend)] = cls
+        return cls
+
+    return decorator
+
+
+def _load(backend):
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown barrier backend: {backend} (choose from {', '.join(BACKENDS)})")
+    importlib.import_module(BACKENDS[backend])
+
+
+def get(name, backend="thread"):
+    """
+    Return the barrier class registered as name for backend.
+    """
+    _load(backend)
+    try:
+        return _registry[(name, backend)]
+    except KeyError:
+        raise ValueError(f"No {backend} barrier named {name!r} "
+                         f"(choose from {', '.join(available(backend))})") from None
+
+
+def create(name, backend="thread", *args, **kwargs):
+    """
+    Build the barrier registered as name for backend. Thread and process
+    barriers take the number of parties, MPI barriers a communicator.
+    """
+    return get(name, backend)(*args, **kwargs)
+
+
+def available(backend="thread"):
+    """
+    Names of the barriers registered for backend, sorted.
+    """
+    _load(backend)
+    return sorted(name for name, kind in _registry if kind == backend)
@@ -0,0 +1,231 @@
+import math
+import threading
+import time
+from array import array
+
+from .base import Barrier, ThreadIds
+from .combining import CombiningTreeBarrier
+from .mcs import ARRIVAL_FANIN, MCSBarrier
+from .policy import AdaptiveWait
+from .registry import register
+
+
+@register("centralized", "thread")
+class CentralizedBarrier(Barrier):
+    """
+    Counter and sense flag under one lock. Waiters watch the sense under
+    the waiting policy (AdaptiveWait by default) and finally park on a
+    Condition until the last arriver flips it.
+    """
+
+    def __init__(self, parties, policy=None):
+        self.parties = parties
+        self.policy = policy if policy is not None else AdaptiveWait()
+        self.count = parties
+        self.sense = False
+        self.local_sense = threading.local()
+        self.lock = threading.Lock()
+        self.barrier_condition = threading.Condition(self.lock)
+
+    def arrive(self, pid=None):
+        with self.lock:
+            # Toggle local sense for this thread
+            current_sense = not self.sense
+            self.local_sense.value = current_sense
+
+            # Decrement the count of threads waiting
+            self.count -= 1
+
+            # If this is the last thread, reset the count, flip the global
+            # sense and wake up all waiting threads
+            if self.count == 0:
+                self.count = self.parties
+                self.sense = current_sense
+                self.barrier_condition.notify_all()
+
+    def depart(self, pid=None):
+        current_sense = self.local_sense.value
+        self.policy.wait(lambda: self.sense == current_sense, self._block)
+
+    def _block(self, done):
+        with self.lock:
+            # Wait until the sense changes
+            while not done():
+                self.barrier_condition.wait()
+
+    def wait(self, pid=None):
+        self.arrive(pid)
+        self.depart(pid)
+
+
+@register("sense-reversing", "thread")
+class SenseReversingBarrier(Barrier):
+    """
+    Centralized sense-reversing barrier: arrivals decrement a counter under
+    a lock, and waiters spin on the shared sense (yielding the GIL) until
+    the last arriver flips it.
+    """
+
+    def __init__(self, parties):
+        self.parties = parties
+        self.count = parties
+        self.sense = False
+        self.local_sense = threading.local()
+        self.lock = threading.Lock()
+
+    def arrive(self, pid=None):
+        local_sense = not getattr(self.local_sense, "value", False)
+        self.local_sense.value = local_sense
+        with self.lock:
+            self.count -= 1
+            last = self.count == 0
+            if last:
+                self.count = self.parties
+        if last:
+            self.sense = local_sense
+
+    def depart(self, pid=None):
+        local_sense = self.local_sense.value
+        while self.sense != local_sense:
+            time.sleep(0)
+
+    def wait(self, pid=None):
+        self.arrive(pid)
+        self.depart(pid)
+
+
+# Tournament roles, one per thread and round
+BYE, WINNER, LOSER, CHAMPION = range(4)
+
+
+@register("tournament", "thread")
+class TournamentBarrier(Barrier):
+    """
+    Tournament barrier: in round k the thread 2^(k-1) places after a winner
+    (the loser) signals it and waits to be woken; the champion, thread 0,
+    wakes the winners back down the rounds. Roles, opponents and flags are
+    flat arrays of P * ceil(log2 P) entries, entry pid * rounds + k - 1
+    for round k, and waiters poll with sleep(0) so the GIL goes to the
+    threads still on their way.
+    """
+
+    def __init__(self, parties):
+        self.parties = parties
+        self.rounds = rounds = math.ceil(math.log2(parties)) if parties > 1 else 0
+        self.ids = ThreadIds(parties)
+        self.sense = array("b", [1] * parties)
+        self.roles = array("b", [BYE] * (parties * rounds))
+        self.opponents = array("i", [-1] * (parties * rounds))
+        self.flags = array("b", [0] * (parties * rounds))
+
+        for pid in range(parties):
+            for k in range(1, rounds + 1):
+                span, half = 1 << k, 1 << (k - 1)
+                entry = pid * rounds + k - 1
+                if pid % span == half:
+                    # A loser is paired with the thread 2^(k-1) before it
+                    self.roles[entry] = LOSER
+                    self.opponents[entry] = (pid - half) * rounds + k - 1
+                elif pid % span == 0 and pid + half < parties:
+                    self.roles[entry] = CHAMPION if k == rounds else WINNER
+                    self.opponents[entry] = (pid + half) * rounds + k - 1
+
+    def wait(self, pid=None):
+        pid = self.ids.get(pid)
+        sense = self.sense[pid]
+        roles, opponents, flags = self.roles, self.opponents, self.flags
+        base = pid * self.rounds
+        entry = base
+
+        # Arrival: climb until this thread loses a round or wins it all
+        for entry in range(base, base + self.rounds):
+            role = roles[entry]
+            if role == LOSER:
+                flags[opponents[entry]] = sense
+                while flags[entry] != sense:
+                    time.sleep(0)
+                break
+            if role == WINNER:
+                while flags[entry] != sense:
+                    time.sleep(0)
+            elif role == CHAMPION:
+                while flags[entry] != sense:
+                    time.sleep(0)
+                flags[opponents[entry]] = sense
+                break
+
+        # Wakeup: release the losers of the rounds this thread won
+        for entry in range(entry - 1, base - 1, -1):
+            if roles[entry] == WINNER:
+                flags[opponents[entry]] = sense
+
+        self.sense[pid] = 1 - sense
+
+
+@register("dissemination", "thread")
+class DisseminationBarrier(Barrier):
+    """
+    Dissemination barrier: in round r every thread signals thread
+    (pid + 2^r) mod P and waits for thread (pid - 2^r) mod P, so all have
+    arrived after ceil(log2 P) rounds. Flags alternate between two parity
+    sets and the sense flips every other episode, so no flag is reset.
+    """
+
+    def __init__(self, parties):
+        self.parties = parties
+        self.rounds = math.ceil(math.log2(parties)) if parties > 1 else 0
+        self.ids = ThreadIds(parties)
+        self.flags = [[[False] * self.rounds for _ in range(2)] for _ in range(parties)]
+        self.parity = [0] * parties
+        self.sense = [True] * parties
+
+    def wait(self, pid=None):
+        pid = self.ids.get(pid)
+        parity, sense = self.parity[pid], self.sense[pid]
+        my_flags = self.flags[pid][parity]
+        for r in range(self.rounds):
+            partner = (pid + (1 << r)) % self.parties
+            self.flags[partner][parity][r] = sense
+            while my_flags[r] != sense:
+                time.sleep(0)
+        if parity == 1:
+            self.sense[pid] = not sense
+        self.parity[pid] = 1 - parity
+
+
+@register("mcs", "thread")
+class MCSThreadBarrier(MCSBarrier):
+    """
+    MCS tree barrier (see barriers.mcs.MCSBarrier); waiters poll their own
+    flag with sleep(0).
+    """
+
+    def __init__(self, parties):
+        self.ids = ThreadIds(parties)
+        self.flags = array("b", [0] * ((ARRIVAL_FANIN + 1) * parties))
+        self._init_tree(parties)
+
+    def _await(self, index, value):
+        flags = self.flags
+        while flags[index] != value:
+            time.sleep(0)
+
+
+@register("combining-tree", "thread")
+class CombiningTreeThreadBarrier(CombiningTreeBarrier):
+    """
+    Combining-tree barrier (see barriers.combining.CombiningTreeBarrier);
+    waiters poll their node's sense with sleep(0).
+    """
+
+    def __init__(self, parties, fanin=4):
+        self.ids = ThreadIds(parties)
+        self._init_tree(parties, fanin)
+        self.locks = [threading.Lock() for _ in range(self.nodes)]
+        self.flags = array("i", [0] * (2 * self.nodes))
+        self._init_counters()
+
+    def _await(self, index, value):
+        flags = self.flags
+        while flags[index] != value:
+            time.sleep(0)
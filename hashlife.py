@@ -0,0 +1,337 @@
+import numpy as np
+
+from Conway_game_of_life import ALIVE, CELL_DTYPE, step_board
+
+# Jumps shorter than this are cheaper to do with the stencil
+MIN_JUMP = 16
+
+
+class NodeLimit(Exception):
+    """
+    Raised by step() when the node table outgrows max_nodes mid-jump.
+    """
+
+
+class Node:
+    """
+    Canonical quadtree node covering 2^level x 2^level cells.
+    Nodes are hash-consed, so equal subtrees are the same object.
+    """
+    __slots__ = ("nw", "ne", "sw", "se", "level", "population")
+
+    def __init__(self, nw, ne, sw, se, level, population):
+        self.nw = nw
+        self.ne = ne
+        self.sw = sw
+        self.se = se
+        self.level = level
+        self.population = population
+
+
+# The two level-0 nodes: a single dead or live cell
+DEAD_CELL = Node(None, None, None, None, 0, 0)
+LIVE_CELL = Node(None, None, None, None, 0, 1)
+
+
+class HashLife:
+    """
+    Memoized quadtree Life engine.
+
+    join() interns nodes in a hash-consing table and step() memoizes the
+    future of every node, so regular patterns advance 2^k generations in
+    roughly k levels of work. When the table grows past max_nodes, the table
+    and the memo are dropped and only the live tree is interned again; a
+    jump that overflows the table on its own is abandoned with NodeLimit,
+    so it can be retried as shorter jumps.
+    """
+
+    def __init__(self, max_nodes=1_000_000):
+        self.max_nodes = max_nodes
+        self.table = {}
+        self.results = {}
+        self.empty_nodes = [DEAD_CELL]
+        self.evictions = 0
+
+    def join(self, nw, ne, sw, se):
+        """
+        Return the canonical node with the four given quadrants.
+        """
+        key = (nw, ne, sw, se)
+        node = self.table.get(key)
+        if node is None:
+            node = Node(nw, ne, sw, se, nw.level + 1,
+                        nw.population + ne.population + sw.population + se.population)
+            self.table[key] = node
+        return node
+
+    def empty(self, level):
+        """
+        Return the all-dead node of the given level.
+        """
+        while len(self.empty_nodes) <= level:
+            child = self.empty_nodes[-1]
+            self.empty_nodes.append(self.join(child, child, child, child))
+        return self.empty_nodes[level]
+
+    def center(self, node):
+        return self.join(node.nw.se, node.ne.sw, node.sw.ne, node.se.nw)
+
+    def expand(self, node):
+        """
+        Surround node with dead cells: same cells, one level up, centered.
+        """
+        border = self.empty(node.level - 1)
+        return self.join(self.join(border, border, border, node.nw),
+                         self.join(border, border, node.ne, border),
+                         self.join(border, node.sw, border, border),
+                         self.join(node.se, border, border, border))
+
+    def is_padded(self, node):
+        """
+        True when every live cell of node lies in its central quarter.
+        """
+        return (node.nw.population == node.nw.se.population and
+                node.ne.population == node.ne.sw.population and
+                node.sw.population == node.sw.ne.population and
+                node.se.population == node.se.nw.population)
+
+    def _life_4x4(self, node):
+        """
+        Advance the central 2x2 cells of a level-2 node by one generation.
+        """
+        cells = np.zeros((4, 4), dtype=CELL_DTYPE)
+        for row, half in ((0, (node.nw, node.ne)), (2, (node.sw, node.se))):
+            for col, quad in zip((0, 2), half):
+                cells[row, col] = quad.nw.population
+                cells[row, col + 1] = quad.ne.population
+                cells[row + 1, col] = quad.sw.population
+                cells[row + 1, col + 1] = quad.se.population
+
+        def cell(r, c):
+            neighbors = cells[r - 1:r + 2, c - 1:c + 2].sum() - cells[r, c]
+            alive = neighbors == 3 or (cells[r, c] == ALIVE and neighbors == 2)
+            return LIVE_CELL if alive else DEAD_CELL
+
+        return self.join(cell(1, 1), cell(1, 2), cell(2, 1), cell(2, 2))
+
+    def step(self, node, j):
+        """
+        Return the central half of node advanced by 2^j generations
+        (j <= node.level - 2).
+        """
+        if node.population == 0:
+            return node.nw
+        key = (node, j)
+        result = self.results.get(key)
+        if result is not None:
+            return result
+
+        if len(self.table) > self.max_nodes:
+            raise NodeLimit(f"More than {self.max_nodes} nodes")
+
+        if node.level == 2:
+            result = self._life_4x4(node)
+        else:
+            # Nine overlapping subnodes, one level down
+            nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+            parts = [
+                nw,
+                self.join(nw.ne, ne.nw, nw.se, ne.sw),
+                ne,
+                self.join(nw.sw, nw.se, sw.nw, sw.ne),
+                self.join(nw.se, ne.sw, sw.ne, se.nw),
+                self.join(ne.sw, ne.se, se.nw, se.ne),
+                sw,
+                self.join(sw.ne, se.nw, sw.se, se.sw),
+                se,
+            ]
+            if j == node.level - 2:
+                # Full speed: both halves of the jump advance by 2^(j-1)
+                parts = [self.step(part, j - 1) for part in parts]
+                inner_j = j - 1
+            else:
+                parts = [self.center(part) for part in parts]
+                inner_j = j
+            result = self.join(
+                self.step(self.join(parts[0], parts[1], parts[3], parts[4]), inner_j),
+                self.step(self.join(parts[1], parts[2], parts[4], parts[5]), inner_j),
+                self.step(self.join(parts[3], parts[4], parts[6], parts[7]), inner_j),
+                self.step(self.join(parts[4], parts[5], parts[7], parts[8]), inner_j),
+            )
+
+        self.results[key] = result
+        return result
+
+    def advance(self, node, origin, j):
+        """
+        Advance a root node whose top-left cell sits at origin (row, col) by
+        2^j generations on the infinite plane. Returns (node, origin).
+        """
+        while node.level < j + 2 or not self.is_padded(node):
+            node, origin = self._expand_root(node, origin)
+        node, origin = self._expand_root(node, origin)
+        quarter = 1 << (node.level - 2)
+        return self.step(node, j), (origin[0] + quarter, origin[1] + quarter)
+
+    def _expand_root(self, node, origin):
+        shift = 1 << (node.level - 1)
+        return self.expand(node), (origin[0] - shift, origin[1] - shift)
+
+    def from_grid(self, grid):
+        """
+        Build a root node holding grid, with its top-left cell at (0, 0).
+        """
+        rows, cols = grid.shape
+        level = max(1, int(max(rows, cols) - 1).bit_length())
+        padded = np.zeros((1 << level, 1 << level), dtype=CELL_DTYPE)
+        padded[:rows, :cols] = grid
+        return self._build(padded, level)
+
+    def _build(self, cells, level):
+        if not cells.any():
+            return self.empty(level)
+        if level == 0:
+            return LIVE_CELL
+        half = 1 << (level - 1)
+        return self.join(self._build(cells[:half, :half], level - 1),
+                         self._build(cells[:half, half:], level - 1),
+                         self._build(cells[half:, :half], level - 1),
+                         self._build(cells[half:, half:], level - 1))
+
+    def to_grid(self, node, origin, rows, cols):
+        """
+        Copy the cells of a root node at origin into a rows x cols grid.
+        Live cells outside the grid are dropped.
+        """
+        grid = np.zeros((rows, cols), dtype=CELL_DTYPE)
+        self._fill(grid, node, origin[0], origin[1])
+        return grid
+
+    def _fill(self, grid, node, row, col):
+        size = 1 << node.level
+        if (node.population == 0 or row >= grid.shape[0] or col >= grid.shape[1]
+                or row + size <= 0 or col + size <= 0):
+            return
+        if node.level == 0:
+            grid[row, col] = ALIVE
+            return
+        half = size >> 1
+        self._fill(grid, node.nw, row, col)
+        self._fill(grid, node.ne, row, col + half)
+        self._fill(grid, node.sw, row + half, col)
+        self._fill(grid, node.se, row + half, col + half)
+
+    def bounds(self, node, origin):
+        """
+        Return (top, bottom, left, right) of the live cells, inclusive,
+        or None for an empty node.
+        """
+        if node.population == 0:
+            return None
+        if node.level == 0:
+            return origin[0], origin[0], origin[1], origin[1]
+        half = 1 << (node.level - 1)
+        boxes = [self.bounds(child, (origin[0] + dr, origin[1] + dc))
+                 for child, dr, dc in ((node.nw, 0, 0), (node.ne, 0, half),
+                                       (node.sw, half, 0), (node.se, half, half))]
+        boxes = [box for box in boxes if box is not None]
+        return (min(b[0] for b in boxes), max(b[1] for b in boxes),
+                min(b[2] for b in boxes), max(b[3] for b in boxes))
+
+    def collect(self, node):
+        """
+        Evict the memo and the hash-consing table if they have outgrown
+        max_nodes, keeping only the tree under node. Returns the node to use.
+        """
+        if len(self.table) <= self.max_nodes:
+            return node
+        self.table = {}
+        self.results = {}
+        self.empty_nodes = [DEAD_CELL]
+        self.evictions += 1
+        return self._intern(node)
+
+    def _intern(self, node):
+        if node.level == 0:
+            return node
+        if node.population == 0:
+            return self.empty(node.level)
+        return self.join(self._intern(node.nw), self._intern(node.ne),
+                         self._intern(node.sw), self._intern(node.se))
+
+
+def grid_margin(grid):
+    """
+    Distance from the live cells of grid to its outermost ring of cells,
+    or None for an empty grid.
+    """
+    live_rows = np.flatnonzero(grid.any(axis=1))
+    if live_rows.size == 0:
+        return None
+    live_cols = np.flatnonzero(grid.any(axis=0))
+    rows, cols = grid.shape
+    return min(live_rows[0] - 1, rows - 2 - live_rows[-1],
+               live_cols[0] - 1, cols - 2 - live_cols[-1])
+
+
+def advance_grid(grid, generations, engine=None):
+    """
+    Return grid advanced by the given number of generations, matching the
+    stencil path exactly.
+
+    HashLife runs on the infinite plane, while the board has dead rows past
+    its top and bottom and wrapping columns. The two agree as long as no
+    live cell reaches the outermost ring of the board, and a pattern grows
+    at most one cell per generation. Each jump is therefore the largest power
+    of two that fits in the distance between the live cells and that ring;
+    while the pattern is too close to it, the stencil is used instead.
+
+    A jump that overflows the engine's node table is retried at half the
+    size. Once even a MIN_JUMP jump overflows it, the next MIN_JUMP
+    generations use the stencil before HashLife is tried again.
+    """
+    engine = engine or HashLife()
+    grid = np.asarray(grid, dtype=CELL_DTYPE)
+    rows, cols = grid.shape
+    node, origin = None, (0, 0)
+    remaining = generations
+    # Largest jump the node table has room for, and the generations left to
+    # run with the stencil once it has none
+    limit = generations
+    stencil = 0
+
+    while remaining > 0:
+        if node is None:
+            margin = grid_margin(grid)
+            if margin is None:
+                break
+            if stencil or (margin < MIN_JUMP and margin < remaining):
+                grid = step_board(grid)
+                remaining -= 1
+                stencil = max(0, stencil - 1)
+                continue
+            node, origin = engine.from_grid(grid), (0, 0)
+
+        box = engine.bounds(node, origin)
+        if box is None:
+            break
+        margin = min(box[0] - 1, rows - 2 - box[1], box[2] - 1, cols - 2 - box[3])
+        jump = min(margin, remaining, limit)
+        if jump >= MIN_JUMP or jump == remaining:
+            j = jump.bit_length() - 1
+            try:
+                node, origin = engine.advance(node, origin, j)
+            except NodeLimit:
+                node = engine.collect(node)
+                limit = (1 << j) // 2
+                continue
+            node = engine.collect(node)
+            remaining -= 1 << j
+        else:
+            if jump == limit:
+                limit, stencil = generations, MIN_JUMP
+            grid, node = engine.to_grid(node, origin, rows, cols), None
+
+    if node is not None:
+        grid = engine.to_grid(node, origin, rows, cols)
+    return grid
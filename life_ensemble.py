@@ -0,0 +1,209 @@
+from mpi4py import MPI
+import numpy as np
+import argparse
+import hashlib
+import sys
+
+from Conway_game_of_life import CELL_DTYPE, initialize_grid, split_extent, update_block
+
+# Columns of the per-board statistics
+FIELDS = ("board", "density", "seed", "population", "stable_generation", "period", "hash")
+
+
+def board_hash(board):
+    """
+    Hash of a final board, printed in the statistics.
+    """
+    return hashlib.blake2b(board.tobytes(), digest_size=8).hexdigest()
+
+
+class Ensemble:
+    """
+    A stack of independent boards of the same size, advanced together.
+
+    The boards live in one (n, rows + 2, cols + 2) array padded with dead
+    rows and wrapped columns, so one update_block call advances all of them.
+    Every generation each board gets a 64-bit hash (the dot product of its
+    cells with fixed random weights, wrapping), kept for the last
+    max_period generations. A board whose hash repeats has reached a still
+    life or an oscillator; it is taken out of the stack and its statistics
+    are reported, so only the boards still changing cost compute.
+    """
+
+    def __init__(self, boards, ids, max_period=16, seed=0):
+        if max_period < 1:
+            raise ValueError(f"Longest period must be at least 1, not {max_period}")
+        n, rows, cols = boards.shape
+        self.rows = rows
+        self.cols = cols
+        self.ids = np.asarray(ids)
+        self.grid = np.zeros((n, rows + 2, cols + 2), dtype=CELL_DTYPE)
+        self.grid[:, 1:-1, 1:-1] = boards
+        self.next_grid = self.grid.copy()
+        self.generation = 0
+        self.max_period = max_period
+        self.weights = np.random.default_rng(seed).integers(
+            0, 1 << 64, size=rows * cols, dtype=np.uint64, endpoint=False) | np.uint64(1)
+        self.hashes = np.zeros((n, max_period), dtype=np.uint64)
+        self._record()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def cells(self):
+        return self.grid[:, 1:-1, 1:-1]
+
+    def _hash(self):
+        flat = self.cells().reshape(len(self), self.rows * self.cols)
+        return flat.astype(np.uint64) @ self.weights
+
+    def _record(self):
+        self.hashes[:, self.generation % self.max_period] = self._hash()
+
+    def step(self):
+        """
+        Advance every board by one generation. Returns a list of
+        (board id, stable generation, period, final board) for the boards
+        that have just repeated an earlier generation; they leave the stack.
+        """
+        grid = self.grid
+        grid[:, 1:-1, 0] = grid[:, 1:-1, -2]
+        grid[:, 1:-1, -1] = grid[:, 1:-1, 1]
+        update_block(grid, self.next_grid, 1, self.rows + 1, 1, self.cols + 1)
+        self.grid, self.next_grid = self.next_grid, grid
+        self.generation += 1
+
+        # Compare with the hashes of the last max_period generations; the
+        # closest match is the period
+        current = self._hash()
+        ages = (self.generation - np.arange(self.max_period)) % self.max_period
+        ages[ages == 0] = self.max_period
+        known = ages <= self.generation
+        matches = (self.hashes == current[:, None]) & known
+        periods = np.where(matches, ages, self.max_period + 1).min(axis=1)
+        self.hashes[:, self.generation % self.max_period] = current
+
+        done = periods <= self.max_period
+        finished = []
+        if done.any():
+            for i in np.flatnonzero(done):
+                finished.append((int(self.ids[i]), self.generation - int(periods[i]), int(periods[i]),
+                                 self.cells()[i].copy()))
+            self._keep(~done)
+        return finished
+
+    def _keep(self, keep):
+        self.ids = self.ids[keep]
+        self.grid = self.grid[keep]
+        self.next_grid = self.next_grid[keep]
+        self.hashes = self.hashes[keep]
+
+    def remaining(self):
+        """
+        (board id, None, 0, board) for every board still in the stack.
+        """
+        return [(int(board_id), None, 0, self.cells()[i].copy()) for i, board_id in enumerate(self.ids)]
+
+
+def run_ensemble(comm, boards=64, rows=32, cols=32, generations=1000, densities=(0.25,), seed=0,
+                 max_period=16, report_every=50, out=None):
+    """
+    Run boards random soups of rows x cols, board i with density
+    densities[i % len(densities)] and seed seed + i, spread over the ranks
+    of comm in contiguous blocks. Every report_every generations the
+    statistics of the boards that finished are gathered on rank 0 and
+    written to out as CSV lines. Returns (boards stabilized, seconds,
+    cell updates) on rank 0.
+    """
+    if report_every < 1:
+        raise ValueError(f"Reports must come every 1 or more generations, not {report_every}")
+    rank, size = comm.Get_rank(), comm.Get_size()
+    counts, offsets = split_extent(boards, size)
+    ids = range(offsets[rank], offsets[rank] + counts[rank])
+
+    def density(board_id):
+        return densities[board_id % len(densities)]
+
+    stack = np.zeros((counts[rank], rows, cols), dtype=CELL_DTYPE)
+    for i, board_id in enumerate(ids):
+        stack[i] = initialize_grid(rows, cols, "random", density(board_id), seed + board_id)
+    ensemble = Ensemble(stack, ids, max_period=max_period, seed=seed)
+    if rank == 0:
+        out.write(",".join(FIELDS) + "\n")
+
+    finished = []
+    stabilized = 0
+    updates = 0
+
+    def report(records):
+        nonlocal stabilized
+        rows_out = [
+            (board_id, density(board_id), seed + board_id, int(board.sum()),
+             "" if stable is None else stable, period, board_hash(board))
+            for board_id, stable, period, board in records
+        ]
+        gathered = comm.gather(rows_out, root=0)
+        if rank == 0:
+            for line in sorted(line for part in gathered for line in part):
+                out.write(",".join(str(value) for value in line) + "\n")
+                stabilized += line[4] != ""
+            out.flush()
+
+    start = MPI.Wtime()
+    generation = 0
+    while generation < generations:
+        updates += len(ensemble) * rows * cols
+        finished.extend(ensemble.step())
+        generation += 1
+        if generation % report_every == 0 or generation == generations:
+            report(finished)
+            finished = []
+            if comm.allreduce(len(ensemble), op=MPI.SUM) == 0:
+                break
+    report(ensemble.remaining())
+    elapsed = MPI.Wtime() - start
+    updates = comm.reduce(updates, op=MPI.SUM, root=0)
+    return (stabilized, elapsed, updates) if rank == 0 else None
+
+
+def parse_densities(text):
+    try:
+        return tuple(float(part) for part in text.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma-separated densities, got {text!r}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Many independent Game of Life boards, updated together and spread over MPI ranks.")
+    parser.add_argument("--boards", type=int, default=64, help="number of boards")
+    parser.add_argument("--rows", type=int, default=32, help="rows of every board")
+    parser.add_argument("--cols", type=int, default=32, help="columns of every board")
+    parser.add_argument("--generations", type=int, default=1000, help="most generations to run")
+    parser.add_argument("--densities", type=parse_densities, default=(0.25,),
+                        help="comma-separated densities, cycled over the boards")
+    parser.add_argument("--seed", type=int, default=0, help="seed of board 0; board i uses seed + i")
+    parser.add_argument("--max-period", type=int, default=16,
+                        help="longest oscillator period recognized as stable")
+    parser.add_argument("--report-every", type=int, default=50,
+                        help="generations between writes of finished boards")
+    parser.add_argument("--output", default="-", help="CSV file for the per-board statistics (- for stdout)")
+    args = parser.parse_args(argv)
+
+    comm = MPI.COMM_WORLD
+    out = None
+    if comm.Get_rank() == 0:
+        out = sys.stdout if args.output == "-" else open(args.output, "w")
+    result = run_ensemble(comm, args.boards, args.rows, args.cols, args.generations, args.densities,
+                          args.seed, args.max_period, args.report_every, out)
+    if comm.Get_rank() == 0:
+        stabilized, elapsed, updates = result
+        if out is not sys.stdout:
+            out.close()
+        print(f"{args.boards} boards of {args.rows}x{args.cols} on {comm.Get_size()} processes: "
+              f"{stabilized} stabilized in {elapsed:.6f} s, "
+              f"{updates / elapsed if elapsed > 0 else 0.0:.3e} cell updates/s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
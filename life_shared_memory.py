@@ -0,0 +1,160 @@
+import argparse
+import multiprocessing as mp
+import sys
+import time
+from multiprocessing import RawArray
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+# This backend never talks MPI; keep the kernels' mpi4py import from
+# starting an MPI runtime in every worker
+import mpi4py
+mpi4py.rc.initialize = False
+
+from Conway_game_of_life import (CELL_DTYPE, initialize_grid, print_grid, print_report,
+                                 split_extent, step_board, update_block)
+import barriers
+
+
+# Per-worker timings kept in shared memory: compute, barrier
+PHASES = ("compute", "barrier")
+
+
+def worker(index, name, rows, cols, row_start, row_stop, generations, barrier, timings):
+    """
+    Advance rows row_start..row_stop-1 of the shared double-buffered grid
+    for the given number of generations, meeting the other workers at the
+    barrier after every generation. Rows owned by the neighbors are read
+    straight from shared memory.
+    """
+    shm = SharedMemory(name=name)
+    buffers = np.ndarray((2, rows + 2, cols + 2), dtype=CELL_DTYPE, buffer=shm.buf)
+    compute = waiting = 0.0
+
+    for generation in range(generations):
+        grid, new_grid = buffers[generation % 2], buffers[(generation + 1) % 2]
+        start = time.perf_counter()
+        update_block(grid, new_grid, row_start, row_stop, 1, cols + 1)
+
+        # Refresh the wrapped columns of the rows this worker owns
+        new_grid[row_start:row_stop, 0] = new_grid[row_start:row_stop, cols]
+        new_grid[row_start:row_stop, cols + 1] = new_grid[row_start:row_stop, 1]
+        computed = time.perf_counter()
+
+        # Nobody may read the new buffer, or overwrite the old one, until
+        # every worker has finished this generation
+        barrier.wait(index)
+        compute += computed - start
+        waiting += time.perf_counter() - computed
+
+    timings[index * len(PHASES)] = compute
+    timings[index * len(PHASES) + 1] = waiting
+    del grid, new_grid, buffers
+    shm.close()
+
+
+def run_shared(rows, cols, generations, workers=4, pattern="plus", density=0.25, seed=None,
+               keep_board=False, barrier_algorithm="centralized"):
+    """
+    Run the Game of Life with worker processes sharing one double-buffered
+    grid in multiprocessing.shared_memory, split into row strips, meeting at
+    the named process barrier. Returns statistics in the same form as
+    Conway_game_of_life.run_game; with keep_board=True they also hold the
+    starting board under "initial", which an unseeded random pattern makes
+    impossible to rebuild.
+    """
+    board = initialize_grid(rows, cols, pattern, density, seed)
+    counts, offsets = split_extent(rows, workers)
+    if min(counts) < 1:
+        raise ValueError(f"Grid of {rows} rows is too small for {workers} workers")
+
+    # Two padded buffers: dead rows above and below, wrapped columns
+    shm = SharedMemory(create=True, size=2 * (rows + 2) * (cols + 2) * np.dtype(CELL_DTYPE).itemsize)
+    try:
+        buffers = np.ndarray((2, rows + 2, cols + 2), dtype=CELL_DTYPE, buffer=shm.buf)
+        buffers[:] = 0
+        buffers[0, 1:-1, 1:-1] = board
+        buffers[0, 1:-1, 0] = board[:, -1]
+        buffers[0, 1:-1, -1] = board[:, 0]
+
+        barrier = barriers.create(barrier_algorithm, "process", workers)
+        timings = RawArray("d", workers * len(PHASES))
+        processes = [
+            mp.Process(target=worker, args=(i, shm.name, rows, cols, 1 + offsets[i],
+                                            1 + offsets[i] + counts[i], generations, barrier, timings))
+            for i in range(workers)
+        ]
+
+        start = time.perf_counter()
+        try:
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+        finally:
+            barrier.close()
+        elapsed = time.perf_counter() - start
+
+        if any(process.exitcode != 0 for process in processes):
+            raise RuntimeError("A shared-memory worker failed")
+        final = buffers[generations % 2, 1:-1, 1:-1].copy()
+        del buffers
+    finally:
+        shm.close()
+        shm.unlink()
+
+    per_worker = np.frombuffer(timings, dtype=np.float64).reshape(workers, len(PHASES))
+    return {
+        "processes": workers,
+        "rows": rows,
+        "cols": cols,
+        "generations": generations,
+        "seconds": elapsed,
+        "cell_updates_per_second": rows * cols * generations / elapsed if elapsed > 0 else 0.0,
+        "phases": {phase: (per_worker[:, i].max(), per_worker[:, i].mean())
+                   for i, phase in enumerate(PHASES)},
+        "board": final if keep_board else None,
+        "initial": board if keep_board else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Game of Life on one machine with worker processes sharing the grid.")
+    parser.add_argument("--rows", type=int, default=20, help="grid rows")
+    parser.add_argument("--cols", type=int, default=20, help="grid columns")
+    parser.add_argument("--generations", type=int, default=10, help="number of generations to run")
+    parser.add_argument("--workers", type=int, default=4, help="number of worker processes")
+    parser.add_argument("--pattern", default="plus",
+                        help="initial board: plus, random, or an RLE (.rle) or plaintext (.cells) file")
+    parser.add_argument("--density", type=float, default=0.25, help="live cell density of the random pattern")
+    parser.add_argument("--seed", type=int, default=None, help="seed of the random pattern")
+    parser.add_argument("--barrier", default="centralized", choices=barriers.available("process"),
+                        help="process barrier the workers meet at every generation")
+    parser.add_argument("--benchmark", action="store_true", help="do not print the final board")
+    parser.add_argument("--verify", action="store_true",
+                        help="check the final board against the single-process stencil")
+    args = parser.parse_args(argv)
+
+    stats = run_shared(args.rows, args.cols, args.generations, args.workers, args.pattern,
+                       args.density, args.seed, keep_board=True,
+                       barrier_algorithm=args.barrier)
+    if not args.benchmark:
+        print(f"\nCurrent Grid State (generation {args.generations}):")
+        print_grid(stats["board"])
+    print_report(stats)
+
+    if args.verify:
+        expected = stats["initial"]
+        for _ in range(args.generations):
+            expected = step_board(expected)
+        differing = int(np.count_nonzero(stats["board"] != expected))
+        if differing:
+            print(f"Verification FAILED: {differing} cells differ from the stencil path")
+            sys.exit(1)
+        print(f"Verification passed: matches the stencil path after {args.generations} generations")
+
+
+if __name__ == "__main__":
+    main()